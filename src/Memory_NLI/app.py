@@ -19,9 +19,8 @@ from idom import use_state
 
 import os
 import ast
-
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import hashlib
+import threading
 
 
 import pandas as pd
@@ -31,12 +30,33 @@ from nl2pandas.backend.pandas_generator.manager.manager import PandasManager
 from nl2pandas.backend.pandas_generator.refiner.refiner import Refiner
 from nl2pandas.backend.pandas_generator.code_generator.code_generator import CodeGenerator
 
+from Memory_NLI.memory_index import EmbeddingIndex, UtteranceIndex
+from Memory_NLI.memory_store import MemoryStore
+
 
 shell = InteractiveShell()
 context = Context(shell)
 pandas_manager = PandasManager(context)
 
 
+def dataframe_fingerprint(name, dataframe, content_hash=False):
+    '''
+    This function returns a compact fingerprint of a dataframe for the memory entries: its name, a hash of the
+    column names and dtypes and its shape. If content_hash is True, a hash of the values and index is added, which
+    takes time proportional to the size of the dataframe.
+    '''
+    schema = str(list(zip(dataframe.columns.astype(str), dataframe.dtypes.astype(str))))
+    fingerprint = {
+        "name": name,
+        "schema": hashlib.sha1(schema.encode()).hexdigest(),
+        "shape": dataframe.shape
+    }
+    if content_hash:
+        row_hashes = pd.util.hash_pandas_object(dataframe, index=True).to_numpy()
+        fingerprint["content"] = hashlib.sha1(row_hashes.tobytes()).hexdigest()
+    return str(fingerprint)
+
+
 class MemoryNLI(toga.App):
 
     def startup(self):
@@ -48,28 +68,39 @@ class MemoryNLI(toga.App):
 
         #variables for global storage
         global df
+        global df_name
+        df_name = "Kumpula-June-2016-w-metadata_clean_cl.txt"
         file_path = os.path.dirname(os.path.abspath(__file__)) + '/importable_dataframes/'
-        file_path += "Kumpula-June-2016-w-metadata_clean_cl.txt"
+        file_path += df_name
         df = pd.read_csv(filepath_or_buffer=file_path)
-        context.dataframes['df'] = {
-            'columns': df.columns.tolist(),
-            'indices': df.index.tolist()
-        }
+        context.set_dataframe('df', df)
         context.active_dataframe = 'df'
         global action_info
         action_info = []
         global refiner
         refiner = Refiner(context)
         global past_utterances
-        past_utterances = pd.DataFrame(columns = ["utterance", "action_info_index", "generation_utterance", "refined_kwargs", "dataframe"])
-        file_path = os.path.dirname(os.path.abspath(__file__)) + '/save_files/past_utterances_save.csv'
-        if os.path.exists(file_path):
-            past_utterances = pd.read_csv(filepath_or_buffer = file_path)
+        #the memory entries are kept as a list of dictionaries, the memory store saves every new entry
+        save_files_path = os.path.dirname(os.path.abspath(__file__)) + '/save_files/'
+        self.memory_store = MemoryStore(save_files_path + 'past_utterances.sqlite3')
+        self.memory_store.import_csv(save_files_path + 'past_utterances_save.csv')
+        past_utterances = self.memory_store.load()
+        self.utterance_index = UtteranceIndex()
+        for utterance_index, past_utterance in enumerate(past_utterances):
+            self.utterance_index.add(past_utterance['utterance'], utterance_index)
         global using_memory
         using_memory = False
         global unrefined
         unrefined = True
 
+        # the memory model is loaded in the background so that the UI is not blocked
+        self.memory_model = None
+        self.memory_model_error = None
+        self.pipeline_error = None
+        self.memory_index = None
+        self.memory_model_loaded = threading.Event()
+        threading.Thread(target=self.load_memory_model, daemon=True).start()
+
         main_box = toga.Box(style=Pack(direction=COLUMN))
 
         dataframe_input_label = toga.Label(
@@ -128,6 +159,30 @@ class MemoryNLI(toga.App):
         self.main_window.on_exit = self.save_on_close
         self.main_window.show()
 
+    def load_memory_model(self):
+        '''
+        This function loads the sentence transformer used for the AI based memory output, builds the embedding index
+        of the past utterances and afterwards warms up the NLI pipeline. It runs in a background thread started at
+        startup, the model is shared by all searches. Errors are kept and shown when the model is needed.
+        '''
+        global past_utterances
+        try:
+            from sentence_transformers import SentenceTransformer
+            self.memory_model = SentenceTransformer('sentence-transformers/all-mpnet-base-v2')
+            file_path = os.path.dirname(os.path.abspath(__file__)) + '/save_files/past_utterances_embeddings.npz'
+            self.memory_index = EmbeddingIndex(self.memory_model, file_path)
+            self.memory_index.update([past_utterance['utterance'] for past_utterance in past_utterances])
+            self.memory_index.flush()
+        except Exception as exception:
+            self.memory_model_error = exception
+        finally:
+            self.memory_model_loaded.set()
+
+        try:
+            pandas_manager.pipeline.warmup()
+        except Exception as exception:
+            self.pipeline_error = exception
+
     def generate_ai_based_memory_output(self, main_box):
         '''
         This function genrates the AI memory output by using a sentence transformer to embed the user's utterance and
@@ -160,6 +215,22 @@ class MemoryNLI(toga.App):
         except:
             pass
 
+        #show a loading state instead of blocking the UI until the model is ready
+        if not self.memory_model_loaded.is_set():
+            self.unsure_text = toga.Label(
+                "The memory model is still loading \n try again in a moment",
+                style=Pack(padding=(0, 5))
+            )
+            main_box.add(self.unsure_text)
+            return
+        if self.memory_index is None:
+            self.unsure_text = toga.Label(
+                "The memory model could not be loaded \n " + str(self.memory_model_error),
+                style=Pack(padding=(0, 5))
+            )
+            main_box.add(self.unsure_text)
+            return
+
         global past_utterances
         global refiner
         global action_info
@@ -169,21 +240,22 @@ class MemoryNLI(toga.App):
         options_df = pd.DataFrame(columns=["list_element", "probability", "utterance_index"])
         input_utterance = self.utterance_input.value
 
-        model = SentenceTransformer('sentence-transformers/all-mpnet-base-v2')
+        #entries saved while the model was loading are not indexed yet, indexed utterances are skipped
+        self.memory_index.update([past_utterance['utterance'] for past_utterance in past_utterances])
+
+        #only the input utterance is encoded, the past utterances are looked up in the embedding index
+        threshold = 0.5
+        matches = dict(self.memory_index.search(input_utterance, threshold=threshold))
+        matching_indices = [i for i, past_utterance in enumerate(past_utterances) if past_utterance['utterance'] in matches]
 
-        for utterance_index, past_utterance in past_utterances.iterrows():
-            utterance = past_utterance['utterance']
-            utterances = [utterance, input_utterance]
-            embeddings = model.encode(utterances)
-            similarity = cosine_similarity(embeddings[0].reshape(1,-1), embeddings[1].reshape(1,-1))[0][0]
-            threshold = 0.5
+        for utterance_index in matching_indices:
+            similarity = matches[past_utterances[utterance_index]['utterance']]
 
             if similarity > threshold:
-                temp_action_info = self.generate_action_info(past_utterances.iloc[utterance_index]['generation_utterance'])
-                action_info.append(temp_action_info[past_utterances['action_info_index'][utterance_index]])
+                action_info.append(self.get_memory_action_info(past_utterances[utterance_index]))
                 similarity_percentage = round(similarity * 100, 2)
                 action_info[-1]['probability'] = similarity_percentage
-                list_element = temp_action_info[past_utterances['action_info_index'][utterance_index]]['grounded_action'] + " (" + f"{similarity_percentage:.2f}" + "%)"
+                list_element = action_info[-1]['grounded_action'] + " (" + f"{similarity_percentage:.2f}" + "%)"
                 options_df = pd.concat([options_df, pd.DataFrame.from_records([{"list_element": list_element, "probability": similarity_percentage, "utterance_index": utterance_index}])])
 
            
@@ -251,34 +323,16 @@ class MemoryNLI(toga.App):
         using_memory = True
         action_info = []
         options_df = pd.DataFrame(columns=["list_element", "probability", "utterance_index"])
-        for utterance_index, past_utterance in past_utterances.iterrows():
-            utterance = past_utterance['utterance']
-            if utterance == self.utterance_input.value:
-                temp_action_info = self.generate_action_info(past_utterances.iloc[utterance_index]['generation_utterance'])
-                action_info.append(temp_action_info[past_utterances.iloc[utterance_index]['action_info_index']])
-                action_info[-1]['probability'] = 100
-                list_element = temp_action_info[past_utterances['action_info_index'][utterance_index]]['grounded_action'] + " (100%)"
-                options_df = pd.concat([options_df, pd.DataFrame.from_records([{"list_element": list_element, "probability": 100, "utterance_index": utterance_index}])])
-            #if the input is part of the utterance
-            elif self.utterance_input.value in utterance:
-                temp_action_info = self.generate_action_info(past_utterances.iloc[utterance_index]['generation_utterance'])
-                action_info.append(temp_action_info[past_utterances['action_info_index'][utterance_index]])
-                utterance_correspondence = round((len(self.utterance_input.value) / len(utterance)) * 100, 2)
-                action_info[-1]['probability'] = utterance_correspondence
-                list_element = temp_action_info[past_utterances['action_info_index'][utterance_index]]['grounded_action'] + " (" + f"{utterance_correspondence:.2f}" + "%)"
-                options_df = pd.concat([options_df, pd.DataFrame.from_records([{"list_element": list_element, "probability": utterance_correspondence, "utterance_index": utterance_index}])])
-            #if the utterance is part of the input
-            elif utterance in self.utterance_input.value:
-                temp_action_info = self.generate_action_info(past_utterances.iloc[utterance_index]['generation_utterance'])
-                action_info.append(temp_action_info[past_utterances['action_info_index'][utterance_index]])
-                utterance_correspondence = round((len(utterance) / len(self.utterance_input.value)) * 100, 2)
-                action_info[-1]['probability'] = utterance_correspondence
-                list_element = temp_action_info[past_utterances['action_info_index'][utterance_index]]['grounded_action'] + " (" + f"{utterance_correspondence:.2f}" + "%)"
-                options_df = pd.concat([options_df, pd.DataFrame.from_records([{"list_element": list_element, "probability": utterance_correspondence, "utterance_index": utterance_index}])])
+        #the utterance index returns the matches already ranked by their correspondence
+        for utterance_index, utterance_correspondence in self.utterance_index.search(self.utterance_input.value):
+            action_info.append(self.get_memory_action_info(past_utterances[utterance_index]))
+            action_info[-1]['probability'] = utterance_correspondence
+            if utterance_correspondence == 100:
+                list_element = action_info[-1]['grounded_action'] + " (100%)"
+            else:
+                list_element = action_info[-1]['grounded_action'] + " (" + f"{utterance_correspondence:.2f}" + "%)"
+            options_df = pd.concat([options_df, pd.DataFrame.from_records([{"list_element": list_element, "probability": utterance_correspondence, "utterance_index": utterance_index}])])
 
-        options_df = options_df.sort_values(by=["probability"], ascending=False)
-
-        action_info = sorted(action_info, key=lambda x: x['probability'], reverse=True)
         options_list = []
         for i in action_info:
             list_element = i['grounded_action'] + " (" + str(i["probability"]) + "%)"
@@ -329,6 +383,14 @@ class MemoryNLI(toga.App):
         except:
             pass
 
+        if self.pipeline_error is not None:
+            self.unsure_text = toga.Label(
+                "The NLI model could not be loaded \n " + str(self.pipeline_error),
+                style=Pack(padding=(0, 5))
+            )
+            main_box.add(self.unsure_text)
+            return
+
         global using_memory
         using_memory = False
         global action_info
@@ -362,6 +424,17 @@ class MemoryNLI(toga.App):
         action_info = pandas_manager.get_programs(line)
         return action_info
 
+    def get_memory_action_info(self, past_utterance):
+        '''
+        This function returns the action info of a memory entry. It is rebuilt from the stored program, so the
+        NLI pipeline only runs for entries saved before the program was stored.
+        '''
+        if past_utterance['program']:
+            program = ast.literal_eval(past_utterance['program'])
+            return pandas_manager.restore_program(program, past_utterance['generation_utterance'])
+        temp_action_info = self.generate_action_info(past_utterance['generation_utterance'])
+        return temp_action_info[past_utterance['action_info_index']]
+
     def show_selected_function(self, main_box, past_utterances_index = None):
         '''
         This function shows the selected function in a read-only text box, generates a button for the user to go into the refinement view and
@@ -390,7 +463,7 @@ class MemoryNLI(toga.App):
         chosen_index = self.option_selection.items.index(self.option_selection.value)
         refiner = pandas_manager.get_refiner(action_info[chosen_index])
         if past_utterances_index is not None:
-            refiner.refined_kwargs = ast.literal_eval(past_utterances["refined_kwargs"][past_utterances_index])
+            refiner.refined_kwargs = ast.literal_eval(past_utterances[int(past_utterances_index)]["refined_kwargs"])
             refiner.update_df_dependencies()
             refiner.refine_kwargs()
 
@@ -595,36 +668,41 @@ class MemoryNLI(toga.App):
 
     def finalize_output(self, past_utterances_index):
         '''
-        This function creates the memory entry in the past_utterances dataframe, drops duplicates from it and 
-        saves it with the save_on_close function.
+        This function creates the memory entry and adds it to the memory store, which ignores duplicates.
         '''
         global action_info
         global refiner
         global df
+        global df_name
         global past_utterances
         global using_memory
+        dataframe = dataframe_fingerprint(df_name, df)
+        program = pandas_manager.get_program_record(action_info[self.option_selection.items.index(self.option_selection.value)])
         if using_memory:
-            chosen_action_info_index = past_utterances["action_info_index"][past_utterances_index]
-            past_utterances = pd.concat([past_utterances, pd.DataFrame.from_records([{
+            chosen_action_info_index = past_utterances[int(past_utterances_index)]["action_info_index"]
+            past_utterance = self.memory_store.add({
                 "utterance": action_info[0]['nl_utterance'],
                 "action_info_index": chosen_action_info_index,
                 "generation_utterance": action_info[self.option_selection.items.index(self.option_selection.value)]['nl_utterance'],
                 "refined_kwargs": refiner._refined_kwargs,
-                "dataframe": df
-            }])])
+                "dataframe": dataframe,
+                "program": program
+            })
         else:
             chosen_action_info_index = self.option_selection.items.index(self.option_selection.value)
-            past_utterances = pd.concat([past_utterances, pd.DataFrame.from_records([{
+            past_utterance = self.memory_store.add({
                 "utterance": action_info[0]['nl_utterance'],
                 "action_info_index": chosen_action_info_index,
                 "generation_utterance": action_info[0]['nl_utterance'],
                 "refined_kwargs": refiner._refined_kwargs,
-                "dataframe": df
-            }])])
-        past_utterances['refined_kwargs'] = past_utterances['refined_kwargs'].astype(str)
-        past_utterances['dataframe'] = past_utterances['dataframe'].astype(str)
-        past_utterances.drop_duplicates(keep='first', inplace=True)
-        self.save_on_close()
+                "dataframe": dataframe,
+                "program": program
+            })
+        if past_utterance is not None:
+            past_utterances.append(past_utterance)
+            self.utterance_index.add(past_utterance['utterance'], len(past_utterances) - 1)
+        if self.memory_model_loaded.is_set() and self.memory_index is not None:
+            self.memory_index.update([action_info[0]['nl_utterance']])
 
     def copy_to_clipboard(self, text, past_utterances_index):
         '''
@@ -642,20 +720,22 @@ class MemoryNLI(toga.App):
         file_path = os.path.dirname(os.path.abspath(__file__)) + '/importable_dataframes/'
         file_path += self.dataframe_input.value
         global df
+        global df_name
         df = pd.read_csv(filepath_or_buffer=file_path)
-        context.dataframes['df'] = {
-            'columns': df.columns.tolist(),
-            'indices': df.index.tolist()
-        }
+        df_name = self.dataframe_input.value
+        context.set_dataframe('df', df)
         context.active_dataframe = 'df'
 
-    def save_on_close(self):
+    def save_on_close(self, *args, **kwargs):
         '''
-        This function saves tha past_utterances dataframe into a csv file, so it can be loaded the next time the application is started.
+        This function closes the memory store when the application is closed. The entries are already saved when
+        they are added, closing only merges the write-ahead log into the database file. Embeddings of the memory
+        index that were not saved yet are saved.
         '''
-        global past_utterances
-        file_path = os.path.dirname(os.path.abspath(__file__)) + '/save_files/past_utterances_save.csv'
-        past_utterances.to_csv(file_path, index = False)
+        self.memory_store.close()
+        if self.memory_index is not None:
+            self.memory_index.flush()
+        return True
 
 
 def main():
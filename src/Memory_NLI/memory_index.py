@@ -0,0 +1,200 @@
+"""
+Indices over the past utterances of the Memory NLI, used by the memory outputs.
+"""
+import os
+
+import numpy as np
+
+
+class EmbeddingIndex:
+    '''
+    This class keeps the normalized embeddings of the past utterances, keyed by the utterance text, and saves them to
+    a .npz file. Every utterance is only encoded once, so a search only has to encode the user's utterance.
+    The file is rewritten after save_every new utterances and by flush, embeddings that were not saved are encoded
+    again when the index is updated with all past utterances at the next start.
+    '''
+
+    def __init__(self, model, file_path, save_every=32):
+        '''
+        model is the sentence transformer used for encoding and file_path the .npz file the index is saved to.
+        If the file exists, the saved embeddings are loaded.
+        '''
+        self.model = model
+        self.file_path = file_path
+        self.save_every = save_every
+        self.num_unsaved = 0
+        self.utterances = []
+        self.positions = {}
+        self.embeddings = None
+        if os.path.exists(file_path):
+            self.load()
+
+    def encode(self, utterances):
+        '''
+        This function encodes the utterances and normalizes the embeddings, so that the dot product of two
+        embeddings is their cosine similarity.
+        '''
+        embeddings = np.asarray(self.model.encode(utterances), dtype=float).reshape(len(utterances), -1)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return embeddings / norms
+
+    def update(self, utterances):
+        '''
+        This function adds the utterances, which are not yet in the index, with one batch encoding. The index is
+        saved once save_every utterances were added since it was last saved.
+        '''
+        new_utterances = list(dict.fromkeys(u for u in utterances if u not in self.positions))
+        if not new_utterances:
+            return
+
+        new_embeddings = self.encode(new_utterances)
+        if self.embeddings is None:
+            self.embeddings = new_embeddings
+        else:
+            self.embeddings = np.vstack([self.embeddings, new_embeddings])
+
+        for utterance in new_utterances:
+            self.positions[utterance] = len(self.utterances)
+            self.utterances.append(utterance)
+
+        self.num_unsaved += len(new_utterances)
+        if self.num_unsaved >= self.save_every:
+            self.save()
+
+    def flush(self):
+        '''
+        This function saves the index if utterances were added since it was last saved.
+        '''
+        if self.num_unsaved > 0:
+            self.save()
+
+    def search(self, utterance, threshold=0.5, top_k=None):
+        '''
+        This function returns the indexed utterances with a cosine similarity above the threshold to the given
+        utterance as a list of (utterance, similarity) tuples, sorted by similarity. If top_k is set, only the
+        top_k most similar utterances are returned.
+        '''
+        if self.embeddings is None:
+            return []
+
+        similarities = self.embeddings @ self.encode([utterance])[0]
+        candidates = np.flatnonzero(similarities > threshold)
+
+        if top_k is not None and len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-similarities[candidates], top_k - 1)[:top_k]]
+        candidates = candidates[np.argsort(-similarities[candidates], kind='stable')]
+
+        return [(self.utterances[i], float(similarities[i])) for i in candidates]
+
+    def load(self):
+        '''
+        This function loads the index from its .npz file.
+        '''
+        with np.load(self.file_path) as saved:
+            self.utterances = saved['utterances'].tolist()
+            self.embeddings = saved['embeddings'] if self.utterances else None
+        self.positions = {utterance: i for i, utterance in enumerate(self.utterances)}
+
+    def save(self):
+        '''
+        This function saves the index to its .npz file.
+        '''
+        np.savez(self.file_path, utterances=np.array(self.utterances, dtype=str), embeddings=self.embeddings)
+        self.num_unsaved = 0
+
+
+class UtteranceIndex:
+    '''
+    This class answers the queries of the rule based memory output without scanning all past utterances: exact
+    matches, past utterances that contain the user's utterance and past utterances contained in the user's
+    utterance. Exact matches are looked up in a dictionary, containment in an inverted index of the n-grams of the
+    past utterances.
+    '''
+
+    def __init__(self, n=3):
+        '''
+        n is the length of the longest n-grams in the inverted index, all shorter n-grams are indexed as well.
+        '''
+        self.n = n
+        self.entries = {}
+        self.ngrams = {}
+        self.max_length = 0
+
+    def add(self, utterance, entry_index):
+        '''
+        This function adds the past utterance of the memory entry at entry_index to the index.
+        '''
+        if utterance not in self.entries:
+            self.entries[utterance] = []
+            self.max_length = max(self.max_length, len(utterance))
+            for ngram in self.get_ngrams(utterance):
+                self.ngrams.setdefault(ngram, set()).add(utterance)
+        self.entries[utterance].append(entry_index)
+
+    def get_ngrams(self, utterance):
+        '''
+        This function returns the set of all substrings of the utterance with a length from 1 to n.
+        '''
+        return {
+            utterance[start:start + length]
+            for length in range(1, self.n + 1)
+            for start in range(len(utterance) - length + 1)
+        }
+
+    def containing(self, utterance):
+        '''
+        This function returns the past utterances that contain the given utterance.
+        '''
+        if not utterance:
+            return list(self.entries)
+        if len(utterance) <= self.n:
+            return list(self.ngrams.get(utterance, ()))
+
+        #every n-gram of the utterance has to be in the past utterance
+        postings = sorted(
+            (self.ngrams.get(utterance[start:start + self.n], set()) for start in range(len(utterance) - self.n + 1)),
+            key=len
+        )
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return [candidate for candidate in candidates if utterance in candidate]
+
+    def contained(self, utterance):
+        '''
+        This function returns the past utterances that are contained in the given utterance, by looking up its
+        substrings which are not longer than the longest past utterance.
+        '''
+        contained = set()
+        for start in range(len(utterance) + 1):
+            for end in range(start, min(len(utterance), start + self.max_length) + 1):
+                if utterance[start:end] in self.entries:
+                    contained.add(utterance[start:end])
+        return contained
+
+    def search(self, utterance):
+        '''
+        This function returns the indices of the matching memory entries with the correspondence of their utterance to
+        the given utterance as a list of (entry_index, correspondence) tuples, sorted by correspondence.
+        The correspondence is 100 for the same utterance and otherwise the length of the shorter utterance divided by
+        the length of the longer one, as a percentage rounded to two digits.
+        '''
+        matches = {}
+        if utterance in self.entries:
+            matches[utterance] = 100
+        for past_utterance in self.containing(utterance):
+            if past_utterance not in matches:
+                matches[past_utterance] = round((len(utterance) / len(past_utterance)) * 100, 2)
+        for past_utterance in self.contained(utterance):
+            if past_utterance not in matches:
+                matches[past_utterance] = round((len(past_utterance) / len(utterance)) * 100, 2)
+
+        results = [
+            (entry_index, correspondence)
+            for past_utterance, correspondence in matches.items()
+            for entry_index in self.entries[past_utterance]
+        ]
+        return sorted(results, key=lambda result: (-result[1], result[0]))
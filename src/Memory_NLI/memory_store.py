@@ -0,0 +1,106 @@
+"""
+The append-only store of the Memory NLI's memory entries.
+"""
+import os
+import sqlite3
+
+import pandas as pd
+
+
+class MemoryStore:
+    '''
+    This class saves the memory entries to an SQLite database in WAL mode. Every entry is committed when it is added,
+    so saving does not depend on the number of entries and a crash does not lose the session. Duplicate entries are
+    ignored through a uniqueness constraint.
+    '''
+
+    COLUMNS = ["utterance", "action_info_index", "generation_utterance", "refined_kwargs", "dataframe", "program"]
+
+    def __init__(self, file_path):
+        '''
+        file_path is the database file, it is created if it does not exist.
+        '''
+        self.file_path = file_path
+        self.connection = sqlite3.connect(file_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        #the text columns are not null, because sqlite treats nulls as distinct in unique constraints
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS past_utterances ("
+            "id INTEGER PRIMARY KEY, "
+            "utterance TEXT NOT NULL, "
+            "action_info_index INTEGER NOT NULL, "
+            "generation_utterance TEXT NOT NULL, "
+            "refined_kwargs TEXT NOT NULL, "
+            "dataframe TEXT NOT NULL DEFAULT '', "
+            "program TEXT NOT NULL DEFAULT '', "
+            "UNIQUE (utterance, action_info_index, generation_utterance, refined_kwargs, dataframe, program))"
+        )
+        self.connection.commit()
+
+    def _values(self, entry):
+        return (
+            str(entry["utterance"]),
+            int(entry["action_info_index"]),
+            str(entry["generation_utterance"]),
+            str(entry["refined_kwargs"]),
+            str(entry.get("dataframe") or ''),
+            str(entry.get("program") or '')
+        )
+
+    def add(self, entry):
+        '''
+        This function adds a memory entry, a dictionary with the keys in COLUMNS, and commits it.
+        It returns the entry as it is stored, or None if the same entry is already in the store.
+        '''
+        values = self._values(entry)
+        cursor = self.connection.execute(
+            "INSERT OR IGNORE INTO past_utterances (" + ", ".join(self.COLUMNS) + ") VALUES (?, ?, ?, ?, ?, ?)",
+            values
+        )
+        self.connection.commit()
+        if cursor.rowcount == 0:
+            return None
+        return dict(zip(self.COLUMNS, values))
+
+    def load(self):
+        '''
+        This function returns all memory entries as a list of dictionaries, in the order they were added.
+        '''
+        cursor = self.connection.execute(
+            "SELECT " + ", ".join(self.COLUMNS) + " FROM past_utterances ORDER BY id"
+        )
+        return [dict(zip(self.COLUMNS, row)) for row in cursor]
+
+    def import_csv(self, csv_path):
+        '''
+        This function imports the memory entries of a past_utterances_save.csv file from earlier versions of the app.
+        The import only runs once per store, later calls do nothing. Text dumps of dataframes, which earlier versions
+        saved instead of a fingerprint, are not imported.
+        '''
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] > 0 or not os.path.exists(csv_path):
+            return
+
+        past_utterances = pd.read_csv(filepath_or_buffer=csv_path)
+        entries = []
+        for entry in past_utterances.to_dict("records"):
+            dataframe = entry.get("dataframe")
+            if not (isinstance(dataframe, str) and dataframe.startswith("{'name'")):
+                entry["dataframe"] = None
+            if not isinstance(entry.get("program"), str):
+                entry["program"] = None
+            entries.append(self._values(entry))
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO past_utterances (" + ", ".join(self.COLUMNS) + ") VALUES (?, ?, ?, ?, ?, ?)",
+                entries
+            )
+            self.connection.execute("PRAGMA user_version = 1")
+
+    def close(self):
+        '''
+        This function checkpoints the write-ahead log into the database file and closes the connection.
+        '''
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.connection.close()
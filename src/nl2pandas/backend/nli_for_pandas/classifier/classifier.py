@@ -0,0 +1,55 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+from numpy import ndarray
+
+
+class Classifier(ABC):
+    """
+    Abstract class for different classifiers, which predict the probability that two utterances share the same
+    program based on their similarity.
+    """
+
+    @abstractmethod
+    def train(self, x_train: ndarray, y_train: ndarray, epochs: int) -> Any:
+        """
+        Trains the classifier on the given similarities and target values.
+
+        :param x_train: training input data (similarities between utterances)
+        :param y_train: training target data (1 if same action, 0 if different)
+        :param epochs: number of epochs (or iterations) to train the classifier
+
+        :return: the training history
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def predict(self, similarities: ndarray) -> ndarray:
+        """
+        Predicts the probabilities that the utterances share the same program based on their similarities.
+
+        :param similarities: numpy array of similarities
+
+        :return: numpy array of probabilities
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, name: str) -> None:
+        """
+        Saves the classifier to the specified file.
+
+        :param name: file location for saving the classifier
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def load(self, name: str) -> Any:
+        """
+        Loads the classifier from the specified file.
+
+        :param name: file location where the classifier is stored
+
+        :return: the loaded model
+        """
+        raise NotImplementedError
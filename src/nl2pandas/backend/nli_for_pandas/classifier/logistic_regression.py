@@ -0,0 +1,127 @@
+import json
+from typing import Dict, List
+
+import numpy as np
+from nl2pandas.backend.nli_for_pandas.classifier.classifier import Classifier
+from numpy import ndarray
+
+
+def sigmoid(x: ndarray) -> ndarray:
+    """
+    Numerically stable sigmoid function.
+
+    :param x: numpy array of inputs
+
+    :return: numpy array of σ(x)
+    """
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+class LogisticRegression(Classifier):
+    """
+    This class implements the same model as NeuralNet, σ(a cos-sim(φ(f), φ(f′)) + b), as a logistic regression
+    in NumPy. The two scalars a & b are fitted with iteratively reweighted least squares (Newton's method),
+    which converges within a few iterations, and no TensorFlow graph is needed for training or prediction.
+
+    :param a: weight of the similarity, defaults to 0
+    :param b: bias, defaults to 0
+    :param l2: L2 regularization strength, keeps the weights finite for perfectly separable data
+    """
+
+    def __init__(self, a: float = 0.0, b: float = 0.0, l2: float = 1e-4):
+        self.a = a
+        self.b = b
+        self.l2 = l2
+
+    def train(
+            self, x_train: ndarray, y_train: ndarray, epochs: int = 100, tolerance: float = 1e-8
+    ) -> Dict[str, List[float]]:
+        """
+        Fits a and b by minimizing the binary cross entropy with Newton's method.
+
+        :param x_train: training input data (similarities between utterances)
+        :param y_train: training target data (1 if same action, 0 if different)
+        :param epochs: maximum number of Newton iterations
+        :param tolerance: training stops once the update of a and b is smaller than this value
+
+        :return: dictionary with the loss and accuracy after each iteration
+        """
+        x = np.asarray(x_train, dtype=float).reshape(-1)
+        y = np.asarray(y_train, dtype=float).reshape(-1)
+
+        features = np.column_stack([x, np.ones_like(x)])
+        weights = np.array([self.a, self.b], dtype=float)
+        regularization = self.l2 * np.eye(2)
+
+        history: Dict[str, List[float]] = {"loss": [], "accuracy": []}
+
+        for _ in range(epochs):
+            probabilities = sigmoid(features @ weights)
+
+            gradient = features.T @ (probabilities - y) + regularization @ weights
+            hessian = (features.T * (probabilities * (1 - probabilities))) @ features + regularization
+            step = np.linalg.solve(hessian, gradient)
+            weights -= step
+
+            probabilities = sigmoid(features @ weights)
+            clipped = np.clip(probabilities, 1e-7, 1 - 1e-7)
+            history["loss"].append(float(-np.mean(y * np.log(clipped) + (1 - y) * np.log(1 - clipped))))
+            history["accuracy"].append(float(np.mean((probabilities >= 0.5) == (y == 1))))
+
+            if np.max(np.abs(step)) < tolerance:
+                break
+
+        self.a, self.b = float(weights[0]), float(weights[1])
+
+        return history
+
+    def predict(self, similarities: ndarray) -> ndarray:
+        """
+        Predicts the probabilities that the utterances share the same program based on their similarities.
+
+        :param similarities: numpy array of similarities
+
+        :return: numpy array of probabilities
+        """
+        similarities = np.asarray(similarities, dtype=float).reshape(-1)
+        return sigmoid(self.a * similarities + self.b)
+
+    def save(self, name: str = "./models/server_classifier.json") -> None:
+        """
+        Saves a and b to the specified JSON file.
+
+        :param name: file location for saving the classifier
+        """
+        with open(name, "w") as f:
+            json.dump({"a": self.a, "b": self.b}, f)
+
+    def load(self, name: str = "./models/server_classifier.json") -> "LogisticRegression":
+        """
+        Loads a and b from the specified JSON file.
+
+        :param name: file location where the classifier is stored
+
+        :return: the loaded classifier
+        """
+        with open(name) as f:
+            weights = json.load(f)
+
+        self.a = float(weights["a"])
+        self.b = float(weights["b"])
+        return self
+
+    @classmethod
+    def from_keras(cls, name: str = "./models/server_classifier.model") -> "LogisticRegression":
+        """
+        Converts a NeuralNet model saved by Keras into a LogisticRegression with the same weights.
+        TensorFlow is only imported when this method is called.
+
+        :param name: file location of the saved Keras model
+
+        :return: the converted classifier
+        """
+        import tensorflow
+
+        model = tensorflow.keras.models.load_model(name)
+        kernel, bias = model.layers[0].get_weights()
+        return cls(a=float(np.ravel(kernel)[0]), b=float(np.ravel(bias)[0]))
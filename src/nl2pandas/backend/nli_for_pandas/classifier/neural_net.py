@@ -1,3 +1,5 @@
+import tensorflow
+from nl2pandas.backend.nli_for_pandas.classifier.classifier import Classifier
 from numpy import ndarray
 from tensorflow.keras.layers import Dense
 from tensorflow.keras.losses import BinaryCrossentropy
@@ -6,7 +8,7 @@ from tensorflow.keras.optimizers import Adam
 from tensorflow.python.keras.callbacks import History
 
 
-class NeuralNet:
+class NeuralNet(Classifier):
     """
     This class uses a simple two-layer MLP (Multilayer Perceptron) that takes the embeddings of two utterances
     and predicts a probability of them being the same lifted program.
@@ -17,6 +19,7 @@ class NeuralNet:
     """
 
     def __init__(self, lr: float = 0.005):
+        self.lr = lr
         self.model = Sequential()
         # Dense layer performs the following: output = activation(dot(input, kernel) + bias)
         # which is exactly what we want: output = sigmoid(a*input + b)
@@ -64,3 +67,27 @@ class NeuralNet:
         # squeeze so that it results in an array of floats (instead of singleton lists)
         predictions = predictions.squeeze()
         return predictions
+
+    def save(self, name: str = "./models/server_classifier.model") -> None:
+        """
+        Saves the Keras model to the specified file.
+
+        :param name: file location for saving the model
+        """
+        self.model.save(name)
+
+    def load(self, name: str = "./models/server_classifier.model") -> Sequential:
+        """
+        Loads the Keras model from the specified file.
+
+        :param name: file location where the model is stored
+
+        :return: the loaded model
+        """
+        self.model = tensorflow.keras.models.load_model(name)
+        self.model.compile(
+            optimizer=Adam(learning_rate=self.lr),
+            loss=BinaryCrossentropy(),
+            metrics=["accuracy"],
+        )
+        return self.model
@@ -1,14 +1,18 @@
-from typing import List
+from threading import Lock
+from typing import TYPE_CHECKING, List, Optional
 
 from nl2pandas.backend.nli_for_pandas.embedding.embedding import Embedding
 from numpy import ndarray
-from sentence_transformers import SentenceTransformer
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 
 class BERT(Embedding):
     """
     This class uses BERT as a base for calculating the sentence embedding.
     It can be used to find similar sentences.
+    The model is loaded on first use (or by calling warmup), so creating an instance is cheap.
     """
 
     def __init__(self, bert_model="paraphrase-TinyBERT-L6-v2"):  # paraphrase-albert-small-v2
@@ -16,7 +20,39 @@ class BERT(Embedding):
         :param bert_model: different BERT models possible, e.g. paraphrase-distilroberta-base-v1,
         bert-base-nli-mean-tokens, stsb-roberta-large, stsb-roberta-base, ...
         """
-        self.model = SentenceTransformer(bert_model)
+        self.bert_model = bert_model
+        self._model: Optional["SentenceTransformer"] = None
+        self._model_lock = Lock()
+
+    @property
+    def model(self) -> "SentenceTransformer":
+        """
+        The SentenceTransformer model, which is loaded when it is accessed for the first time.
+        """
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    self._model = SentenceTransformer(self.bert_model)
+        return self._model
+
+    @model.setter
+    def model(self, model: "SentenceTransformer"):
+        self._model = model
+
+    @property
+    def identifier(self) -> str:
+        """
+        The name of the BERT model.
+        """
+        return self.bert_model
+
+    def warmup(self) -> None:
+        """
+        Loads the SentenceTransformer model.
+        """
+        self.model
 
     def embed(self, sentences: List[str]) -> ndarray:
         """
@@ -9,6 +9,19 @@ class Embedding(ABC):
     Abstract class for different embeddings, e.g. BERT, GloVe, positional encoding.
     """
 
+    def warmup(self) -> None:
+        """
+        Loads everything that is needed to calculate embeddings, e.g. model weights. Embeddings that load their
+        model lazily should override this, so that the loading can be triggered ahead of the first query.
+        """
+
+    @property
+    def identifier(self) -> str:
+        """
+        Identifies the model that calculates the embeddings. Saved embeddings are only reused for the same identifier.
+        """
+        return type(self).__name__
+
     @abstractmethod
     def embed(self, sentences: List[str]) -> ndarray:
         """
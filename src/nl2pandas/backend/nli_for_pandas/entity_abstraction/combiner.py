@@ -1,7 +1,49 @@
-import collections
+import re
 from typing import Dict, List, Tuple, Union
 
 
+class ActionTemplate:
+    """
+    A lifted action compiled into its literal parts and the entity placeholders (slots) between them.
+
+    :param action: lifted action string, e.g. read <number>
+    :param entity_types: the entity types which can appear as placeholders
+    """
+
+    def __init__(self, action: str, entity_types: List[str]):
+        placeholder = re.compile("<(" + "|".join(entity_types) + ")>")
+
+        self.parts: List[str] = []
+        self.slots: List[Tuple[str, int]] = []  # entity type and index of the entity within its type
+        counts = {entity_type: 0 for entity_type in entity_types}
+        position = 0
+        for match in placeholder.finditer(action):
+            entity_type = match.group(1)
+            self.parts.append(action[position:match.start()])
+            self.slots.append((entity_type, counts[entity_type]))
+            counts[entity_type] += 1
+            position = match.end()
+        self.parts.append(action[position:])
+
+        # number of placeholders per entity type, in the order of entity_types
+        self.signature: Tuple[int, ...] = tuple(counts.values())
+        self.lifted_action = self.join([f"<{entity_type}{i}>" for entity_type, i in self.slots])
+
+    def join(self, slot_values: List[str]) -> str:
+        """
+        Fills the slots with the given strings.
+
+        :param slot_values: one string per slot
+
+        :return: action string
+        """
+        pieces = [self.parts[0]]
+        for slot_value, part in zip(slot_values, self.parts[1:]):
+            pieces.append(slot_value)
+            pieces.append(part)
+        return "".join(pieces)
+
+
 class Combiner:
     """
     This class recombines a lifted action with the corresponding entities (ranges, quotes).
@@ -9,6 +51,22 @@ class Combiner:
 
     def __init__(self):
         self.entity_types = ["number", "value", "number_list", "string_list", "condition"]
+        # compiled templates of the recombined actions, see get_template
+        self._templates: Dict[str, ActionTemplate] = {}
+
+    def get_template(self, action: str) -> ActionTemplate:
+        """
+        Returns the compiled template of the lifted action. Templates are cached per action string.
+
+        :param action: lifted action string, e.g. read <number>
+
+        :return: template of the action
+        """
+        template = self._templates.get(action)
+        if template is None:
+            template = ActionTemplate(action, self.entity_types)
+            self._templates[action] = template
+        return template
 
     def recombine(
             self, action: str, entities: Dict[str, List[str]]
@@ -21,46 +79,21 @@ class Combiner:
 
         :return: grounded action string
         """
+        template = self.get_template(action)
 
-        # count number of replaced entities in lifted action
-        num_lifted = sum(
-            [action.count(f"<{entity_type}>") for entity_type in self.entity_types]
-        )
-        # count number of entities in entity set
-        num_entities = sum(
-            [len(entities[f"{entity_type}s"]) for entity_type in self.entity_types]
-        )
-
-        action_entities = [entity_type for entity_type in self.entity_types if f"<{entity_type}>" in action]
-        entity_entities = [entity_type for entity_type in self.entity_types if len(entities[f"{entity_type}s"]) != 0]
-
-        # check whether number of entities fits lifted placeholders
-        # (modified by Sonasha Auer Wilkins)
-        # check instead if the entities contained in both the actions and entities are the same
-        if num_lifted == num_entities and collections.Counter(action_entities) == collections.Counter(entity_entities):
-
-            grounded_action = action
-            lifted_action = action
+        # check whether the number of entities of every type fits the lifted placeholders
+        if template.signature == tuple(len(entities[f"{entity_type}s"]) for entity_type in self.entity_types):
+
+            # add quotation marks if entity type equals value
+            grounded_action = template.join([
+                '"' + entities["values"][i] + '"' if entity_type == "value" else entities[f"{entity_type}s"][i]
+                for entity_type, i in template.slots
+            ])
+            lifted_action = template.lifted_action
             ordered_entities: Dict[str, Union[str, float, List]] = {}
 
-            for (
-                    entity_type
-            ) in self.entity_types:  # replace entities for the different entity types
+            for entity_type in self.entity_types:  # convert the entities of the different entity types
                 for i, entity in enumerate(entities[f"{entity_type}s"]):
-                    # add quotation marks if entity type equals value
-                    qm = ""
-                    if entity_type == "value":
-                        qm = '"'
-
-                    grounded_action = grounded_action.replace(
-                        f"<{entity_type}>",
-                        qm + entity + qm,
-                        1,  # only replace first occurrence
-                    )
-                    lifted_action = lifted_action.replace(
-                        f"<{entity_type}>", f"<{entity_type}{i}>", 1
-                    )
-
                     # added by Sonasha Auer Wilkins
                     if entity_type == "number":
                         num: float
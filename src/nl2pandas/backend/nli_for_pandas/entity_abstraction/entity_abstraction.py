@@ -27,6 +27,15 @@ condition_regex = (
     r"[ ]?[^\s]+)"
 )
 
+# entity types in the order of priority of lift_entities, with the keys of the entity dictionary
+entity_patterns = (
+    ("condition", condition_regex, "conditions"),
+    ("string_list", string_list_regex, "string_lists"),
+    ("number_list", number_list_regex, "number_lists"),
+    ("value", value_regex, "values"),
+    ("number", number_regex, "numbers"),
+)
+
 
 class EntityAbstraction:
     def __init__(self):
@@ -39,6 +48,7 @@ class EntityAbstraction:
         self.number_matcher = re.compile(number_regex)
         self.number_list_matcher = re.compile(number_list_regex)
         self.condition_matcher = re.compile(condition_regex)
+        self.entity_matchers = [(name, re.compile(regex), key) for name, regex, key in entity_patterns]
 
     def lift_values(self, utterance: str) -> Tuple[str, List[str]]:
         """
@@ -91,7 +101,7 @@ class EntityAbstraction:
         for match in matched_numbers:
             number = match.group()
             entities.append(number)
-        utterance = re.sub(number_regex, "<number>", utterance)
+        utterance = self.number_matcher.sub("<number>", utterance)
 
         return utterance, entities
 
@@ -141,23 +151,28 @@ class EntityAbstraction:
 
         :return: Tuple of lifted utterance and dictionary containing the entities
         """
-        lifted_utterance = utterance
-        lifted_utterance, condition_entities = self.lift_conditions(lifted_utterance)
-        lifted_utterance, list_of_string_entities = self.lift_string_lists(
-            lifted_utterance
-        )
-        lifted_utterance, list_of_number_entities = self.lift_number_lists(lifted_utterance)
-        lifted_utterance, value_entities = self.lift_values(lifted_utterance)
-        lifted_utterance, number_entities = self.lift_numbers(lifted_utterance)
-
-        entity_dict = {
-            "numbers": number_entities,
-            "values": value_entities,
-            "number_lists": list_of_number_entities,
-            "string_lists": list_of_string_entities,
-            "conditions": condition_entities,
+        entity_dict: Dict[str, List] = {
+            "numbers": [],
+            "values": [],
+            "number_lists": [],
+            "string_lists": [],
+            "conditions": [],
         }
 
+        # the entity types are lifted in the order of priority, every match is only replaced at its own position
+        lifted_utterance = utterance
+        for entity_type, matcher, key in self.entity_matchers:
+            entities = entity_dict[key]
+
+            def lift(match, entity_type=entity_type, entities=entities):
+                entity = match.group()
+                if entity_type == "value":
+                    entity = entity.strip("'").strip('"')  # remove " & ' quotation marks
+                entities.append(entity)
+                return f"<{entity_type}>"
+
+            lifted_utterance = matcher.sub(lift, lifted_utterance)
+
         return lifted_utterance, entity_dict
 
     def replace_entities(self, action: str, entities: Dict[str, List]) -> str:
@@ -1,11 +1,13 @@
+import os
 from builtins import zip
-from typing import Dict, List, SupportsFloat, Tuple, Union
+from threading import Lock, RLock, Thread
+from typing import Any, Dict, List, Optional, SupportsFloat, Tuple, Union
 
-import matplotlib.pyplot as plt
 import numpy as np
-import tensorflow
-from imblearn.over_sampling import RandomOverSampler
-from nl2pandas.backend.nli_for_pandas.classifier.neural_net import NeuralNet
+from nl2pandas.backend.nli_for_pandas.classifier.classifier import Classifier
+from nl2pandas.backend.nli_for_pandas.classifier.logistic_regression import (
+    LogisticRegression,
+)
 from nl2pandas.backend.nli_for_pandas.data.data import Data
 from nl2pandas.backend.nli_for_pandas.embedding.BERT import BERT
 from nl2pandas.backend.nli_for_pandas.embedding.embedding import Embedding
@@ -17,51 +19,80 @@ from nl2pandas.backend.nli_for_pandas.similarity.cosine_similarity import (
     CosineSimilarity,
 )
 from nl2pandas.backend.nli_for_pandas.similarity.similarity import Similarity
-from tensorflow.keras.losses import BinaryCrossentropy
-from tensorflow.keras.optimizers import Adam
-from tensorflow.python.keras import Sequential
-from tensorflow.python.keras.callbacks import History
+from numpy import ndarray
 
 
 class Pipeline:
     """
     Contains all steps to translate utterances to an executable command (as defined per DSL).
 
+    Modules that are not passed are created with their defaults. The models are loaded lazily on first use,
+    call warmup to load them ahead of the first query.
+
     :param preprocessing: module for preprocessing the utterances
-    :param entity_abstraction: module for entity abstraction (lifting)
-    :param embedding: module for calculating the embedding
-    :param similarity: module for calculating the similarity measure
-    :param classifier: module that acts as the final classifier
-    :param combiner: module that is used for recombining entities and lifted action
-    :param data: Data object containing the utterances and their actions
+    :param entity_abstraction: module for entity abstraction (lifting), defaults to EntityAbstraction
+    :param embedding: module for calculating the embedding, defaults to BERT
+    :param similarity: module for calculating the similarity measure, defaults to CosineSimilarity
+    :param classifier: module that acts as the final classifier, defaults to LogisticRegression
+    :param combiner: module that is used for recombining entities and lifted action, defaults to Combiner
+    :param data: Data object containing the utterances and their actions, defaults to the atomic actions
     :param certainty_threshold: Threshold below which to output NOT_SURE for probabilities from the classifier
     """
 
     def __init__(
             self,
             preprocessing=None,
-            entity_abstraction: EntityAbstraction = EntityAbstraction(),
-            embedding: Embedding = BERT(),
-            similarity: Similarity = CosineSimilarity(),
-            classifier=NeuralNet(),
-            combiner: Combiner = Combiner(),
-            data=Data(),
+            entity_abstraction: Optional[EntityAbstraction] = None,
+            embedding: Optional[Embedding] = None,
+            similarity: Optional[Similarity] = None,
+            classifier: Optional[Classifier] = None,
+            combiner: Optional[Combiner] = None,
+            data: Optional[Data] = None,
             certainty_threshold: float = 0.5,
     ):
         self.preprocessing = preprocessing
-        self.entity_abstraction = entity_abstraction
-        self.embedding = embedding
-        self.similarity = similarity
-        self.classifier = classifier
-        self.combiner = combiner
-        self.data = data
+        self.entity_abstraction = entity_abstraction if entity_abstraction is not None else EntityAbstraction()
+        self.embedding = embedding if embedding is not None else BERT()
+        self.similarity = similarity if similarity is not None else CosineSimilarity()
+        self.classifier = classifier if classifier is not None else LogisticRegression()
+        self.combiner = combiner if combiner is not None else Combiner()
+        self.data = data if data is not None else Data()
         self.certainty_threshold = certainty_threshold
 
+        # cached embeddings of self.data.utterances, see get_utterance_embeddings
+        self.embeddings_file: Optional[str] = None
+        self._utterance_embeddings: Optional[ndarray] = None
+        self._num_persisted_embeddings = 0
+        # the embeddings are calculated by warmup in a background thread and by the queries
+        self._embeddings_lock = RLock()
+        self._persist_lock = Lock()
+        self._persist_thread: Optional[Thread] = None
+        self._embedded_data: Optional[Data] = None
+
+        # cached lifted forms of the distinct actions of self.data, see get_lifted_action
+        self._lifted_actions: Dict[str, Tuple[str, Dict[str, List[str]]]] = {}
+        self._lifted_data: Optional[Data] = None
+
+        # saved utterances grouped by their action, see get_action_groups
+        self._action_groups: Optional[Tuple[ndarray, ndarray, ndarray]] = None
+        self._grouped_data: Optional[Data] = None
+
+    def warmup(self) -> None:
+        """
+        Loads the embedding model and calculates the embeddings of the saved utterances, so that the first query
+        does not have to wait for them. Newly calculated embeddings are persisted to the embeddings file.
+        """
+        self.embedding.warmup()
+        self.get_utterance_embeddings()
+        self.persist_embeddings()
+
     def add_utterance(self, utterance: str, actions: str):
         """
         Adds a new input utterance with its corresponding actions (split by ";") to the data set,
         on which then can be trained.
         To do so, the utterance and the actions are lifted (to allow for generalization).
+        The embedding of the new utterance is appended to the cached embeddings on their next use and the cached
+        lifted form of the new actions is recalculated.
 
         :param utterance: new input utterance
         :param actions: corresponding list of actions
@@ -73,15 +104,178 @@ class Pipeline:
         # add lifted utterance and actions to dataset
         self.data.utterances.append(lifted_utterance)
         self.data.actions.append(lifted_actions)
+        self._lifted_actions.pop(lifted_actions, None)
+
+    def get_utterance_embeddings(self) -> ndarray:
+        """
+        Returns the embeddings of all utterances in self.data. The embeddings are cached, so only utterances that
+        were added since the last call are embedded. If the file passed to load_embeddings did not contain the
+        utterances, the embeddings are persisted once in a background thread, see persist_embeddings. Embeddings of
+        utterances added later are only kept in memory until persist_embeddings is called.
+
+        :return: matrix containing one embedding per utterance of self.data
+        """
+        with self._embeddings_lock:
+            if self._embedded_data is not self.data:
+                self._utterance_embeddings = None
+                self._embedded_data = self.data
+
+            num_cached = 0 if self._utterance_embeddings is None else len(self._utterance_embeddings)
+            num_utterances = len(self.data.utterances)
+
+            if num_cached > num_utterances:
+                # utterances were removed from the data, the cached rows can not be matched anymore
+                self._utterance_embeddings = None
+                num_cached = 0
+
+            if self._utterance_embeddings is None or num_cached < num_utterances:
+                new_embeddings = np.asarray(self.embedding.embed(self.data.utterances[num_cached:]))
+
+                if self._utterance_embeddings is not None and new_embeddings.shape[1:] != self._utterance_embeddings.shape[1:]:
+                    # the cached embeddings have another dimension, they were calculated by another model
+                    self._utterance_embeddings = None
+                    new_embeddings = np.asarray(self.embedding.embed(self.data.utterances))
+
+                if self._utterance_embeddings is None:
+                    self._utterance_embeddings = np.asarray(new_embeddings)
+                else:
+                    self._utterance_embeddings = np.vstack([self._utterance_embeddings, new_embeddings])
+
+            if self.embeddings_file is not None and self._num_persisted_embeddings <= 0 and self._persist_thread is None:
+                # the file does not contain the utterances, write it once outside of the query
+                self._persist_thread = Thread(target=self.persist_embeddings, daemon=True)
+                self._persist_thread.start()
+
+            return self._utterance_embeddings
+
+    def persist_embeddings(self) -> bool:
+        """
+        Saves the cached embeddings to the embeddings file passed to load_embeddings, if utterances were embedded
+        since the file was written. The file is written without holding the embeddings lock, so queries do not wait
+        for it, and replaced at once, so an interrupted write does not leave a broken file. If the file can not be
+        written, the embeddings stay cached in memory.
+
+        :return: whether the file was written
+        """
+        with self._persist_lock:
+            with self._embeddings_lock:
+                name = self.embeddings_file
+                embeddings = self._utterance_embeddings
+                if name is None or embeddings is None or len(embeddings) == self._num_persisted_embeddings:
+                    return False
+                utterances = self.data.utterances[:len(embeddings)]
+
+            try:
+                self._write_embeddings(name + ".tmp", utterances, embeddings)
+                os.replace(name + ".tmp", name)
+            except OSError as exception:
+                print("Error while saving embeddings: ", exception)
+                return False
+
+            with self._embeddings_lock:
+                if self._utterance_embeddings is not None and len(self._utterance_embeddings) >= len(embeddings):
+                    self._num_persisted_embeddings = len(embeddings)
+            return True
+
+    def get_lifted_action(self, action: str) -> Tuple[str, Dict[str, List[str]]]:
+        """
+        Returns the lifted action and the entities that remain in the saved action. The lifted forms of all distinct
+        actions in self.data are calculated on first use and cached, so the returned entities must not be modified.
+
+        :param action: saved action as in self.data.actions
+
+        :return: Tuple of lifted action and dictionary containing the entities of the action
+        """
+        if self._lifted_data is not self.data:
+            self._lifted_actions = {}
+            self._lifted_data = self.data
+            for data_action in dict.fromkeys(self.data.actions):
+                self._lifted_actions[data_action] = self.entity_abstraction.lift_entities(data_action)
+
+        if action not in self._lifted_actions:
+            self._lifted_actions[action] = self.entity_abstraction.lift_entities(action)
+
+        return self._lifted_actions[action]
+
+    def get_action_groups(self) -> Tuple[ndarray, ndarray, ndarray]:
+        """
+        Groups the saved utterances by their action. The groups are cached and calculated anew when utterances were
+        added to self.data.
 
-    def train_classifier(self, epochs: int = 500, oversample: bool = True) -> History:
+        :return: the indices of the saved utterances sorted by action (in the order of the utterances within an
+        action), the start of every action in these indices, and the end of every action
+        """
+        num_utterances = len(self.data.actions)
+        if (
+                self._grouped_data is not self.data
+                or self._action_groups is None
+                or len(self._action_groups[0]) != num_utterances
+        ):
+            action_ids: Dict[str, int] = {}
+            ids = np.array([action_ids.setdefault(action, len(action_ids)) for action in self.data.actions], dtype=int)
+            order = np.argsort(ids, kind="stable")
+            starts = np.flatnonzero(np.diff(ids[order], prepend=-1))
+            ends = np.append(starts[1:], num_utterances)
+
+            self._action_groups = (order, starts, ends)
+            self._grouped_data = self.data
+
+        return self._action_groups
+
+    def get_candidates(self, probabilities: ndarray, top_k: Optional[int] = None) -> List[int]:
+        """
+        Returns the most probable saved utterance of every action whose probability is above the certainty threshold.
+        Instead of sorting all saved utterances, the maximum probability per action is calculated with
+        np.maximum.reduceat and only the top_k actions are selected with np.argpartition and sorted.
+
+        :param probabilities: probabilities of all saved utterances for one input utterance
+        :param top_k: maximum number of candidates, all candidates if None
+
+        :return: indices of the saved utterances, sorted by probability. Ties are sorted in the order of self.data
+        """
+        order, starts, ends = self.get_action_groups()
+        if len(order) == 0:
+            return []
+
+        action_max = np.maximum.reduceat(probabilities[order], starts)
+        certain = np.flatnonzero(action_max >= self.certainty_threshold)
+
+        if top_k is not None and len(certain) > top_k:
+            # keep the actions that tie with the k-th most probable action, they are cut after sorting
+            kth = -np.partition(-action_max[certain], top_k - 1)[top_k - 1]
+            certain = certain[action_max[certain] >= kth]
+
+        # the first saved utterance with the maximum probability of each action
+        candidates = np.array([
+            order[start + np.argmax(probabilities[order[start:end]])]
+            for start, end in zip(starts[certain], ends[certain])
+        ], dtype=int)
+        candidates = candidates[np.lexsort((candidates, -probabilities[candidates]))] if len(candidates) else candidates
+
+        return candidates[:top_k].tolist()
+
+    def get_embeddings(self, data: Data) -> ndarray:
+        """
+        Returns the embeddings of the utterances of the given data. The cached embeddings are used if the data
+        contains the same utterances as self.data.
+
+        :param data: Data object containing utterances and actions
+
+        :return: matrix containing one embedding per utterance of data
+        """
+        if data is self.data or data.utterances == self.data.utterances:
+            return self.get_utterance_embeddings()
+
+        return self.embedding.embed(data.utterances)
+
+    def train_classifier(self, epochs: int = 500, oversample: bool = True) -> Any:
         """
         Utilizes the whole pipeline to execute training of the classifier using the data of the pipeline
 
-        :param epochs: number of epochs to train the model
+        :param epochs: number of epochs (or iterations) to train the model
         :param oversample: flag whether the dataset should be oversampled
 
-        :return: accuracy on training data
+        :return: training history of the classifier
         """
         # 1. preprocessing of data
         # 2. entity abstraction
@@ -90,11 +284,14 @@ class Pipeline:
 
         # 3. calculate the similarities and true values
         similarities, true_values = self.get_similarities_and_true_values(training_data)
+        self.persist_embeddings()
 
         train_x = np.array(similarities).reshape(-1, 1)
         train_y = np.array(true_values).reshape(-1, 1)
 
         if oversample:
+            from imblearn.over_sampling import RandomOverSampler
+
             # oversample if more than 1 class
             if sum(train_y) / len(train_y) < 1:
                 train_x, train_y = RandomOverSampler().fit_resample(train_x, train_y)
@@ -103,89 +300,108 @@ class Pipeline:
         history = self.classifier.train(train_x, train_y, epochs=epochs)
         return history
 
-    def get_similarities_and_true_values(self, data: Data):
+    def get_similarities_and_true_values(self, data: Data) -> Tuple[ndarray, ndarray]:
         """
         Calculates embeddings for the data utterances and creates all possible pairs of utterances.
         Uses the similarity measure to calculate the similarities and true values.
 
         :param data: Data object containing utterances and actions
 
-        :return: a list of similarity scores as well as the corresponding true values (0 or 1) for all pairs of
-        utterances based on the data in self.data.
+        :return: an array of similarity scores as well as an array of the corresponding true values (0 or 1) for all
+        pairs of utterances based on the data in self.data. The pairs are ordered row by row, i.e. (0, 0), (0, 1), ...
         """
-        embeddings = self.embedding.embed(data.utterances)
+        embeddings = self.get_embeddings(data)
 
-        # create all pairs for utterances
-        indices = range(len(data.utterances))
-        all_pairs = [(i, j) for i in indices for j in indices]
+        # 4. calculate similarity & construct y_train for all pairs of utterances
+        similarities = self.similarity.calculate_matrix(embeddings, embeddings).ravel()
 
-        # 4. calculate similarity & construct y_train
-        true_values = []
-        similarities = []
-        for i1, i2 in all_pairs:
-            sim = self.similarity.calculate(embeddings[i1], embeddings[i2])
-            similarities.append(sim)
-            prob = int(data.actions[i1] == data.actions[i2])
-            true_values.append(prob)
+        actions = np.array(data.actions, dtype=object)
+        true_values = (actions[:, None] == actions[None, :]).astype(int).ravel()
 
         return similarities, true_values
 
+    @staticmethod
+    def get_threshold_metrics(
+            predictions: ndarray, true_values: ndarray, thresholds: ndarray
+    ) -> Tuple[ndarray, ndarray, ndarray]:
+        """
+        Calculates the F1-Score, true positive rate and accuracy for every threshold, where a prediction counts as
+        positive if it is greater than or equal to the threshold.
+        Instead of comparing every prediction with every threshold, the predictions are sorted once and the
+        confusion matrices are read from cumulative sums of the true values.
+
+        :param predictions: probabilities predicted by the classifier
+        :param true_values: corresponding true values (0 or 1)
+        :param thresholds: thresholds to evaluate
+
+        :return: arrays of F1-Scores, true positive rates and accuracies (one value per threshold)
+        """
+        predictions = np.asarray(predictions, dtype=float).reshape(-1)
+        positives = np.asarray(true_values).reshape(-1) == 1
+        thresholds = np.asarray(thresholds, dtype=float)
+
+        order = np.argsort(predictions, kind="stable")
+        sorted_predictions = predictions[order]
+        # number of positives among the i smallest predictions
+        positives_below = np.concatenate([[0], np.cumsum(positives[order])])
+
+        # number of predictions below each threshold, i.e. predicted as negative
+        num_negative = np.searchsorted(sorted_predictions, thresholds, side="left")
+
+        fn = positives_below[num_negative]
+        tn = num_negative - fn
+        tp = positives.sum() - fn
+        fp = len(predictions) - num_negative - tp
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            f1score = np.nan_to_num(2 * tp / (2 * tp + fp + fn))
+            tprs = np.nan_to_num(tp / (tp + fn))
+            accuracies = np.nan_to_num((tp + tn) / len(predictions))
+
+        return f1score, tprs, accuracies
+
     def determine_and_set_certainty_threshold(
-            self, true_positive_threshold: float = 0.9, visualize: bool = False
+            self,
+            true_positive_threshold: float = 0.9,
+            visualize: bool = False,
+            thresholds: Union[str, ndarray, List[float], None] = None,
     ) -> float:
         """
         Calculates the threshold to decide whether to return NOT_SURE or the action corresponding to the utterance.
         If the probability of the classifier is below the threshold, NOT_SURE is returned.
         The threshold is determined by looking at the true positive rate and the threshold has result in a true positive
         rate of above 90% (default - can be adjusted).
+        The threshold is calculated on the utterances in self.data, so it can be recalibrated after adding utterances.
 
         :param true_positive_threshold: threshold above which the true positive rate must be
         :param visualize: whether the threshold calculation should be visualized
+        :param thresholds: the thresholds to evaluate. Defaults to steps of 0.01 between 0 and 1, "distinct" evaluates
+          every distinct prediction of the classifier
 
         :return: the calculated certainty threshold
         """
         # calculate the similarities and true values
-        similarities, true_values = self.get_similarities_and_true_values(Data())
+        similarities, true_values = self.get_similarities_and_true_values(self.data)
 
         # create y_score values
-        predictions = self.classifier.predict(np.array(similarities))
-
-        f1score = []
-        tprs = []
-        accuracies = []
-
-        thresholds = np.arange(0, 1, 0.01)
-        for t in thresholds:
-            tp = 0
-            fp = 0
-            fn = 0
-            tn = 0
-            for i in range(len(predictions)):
-                if predictions[i] >= t and true_values[i] == 1:
-                    tp += 1
-                elif predictions[i] >= t and true_values[i] == 0:
-                    fp += 1
-                elif predictions[i] < t and true_values[i] == 1:
-                    fn += 1
-                elif predictions[i] < t and true_values[i] == 0:
-                    tn += 1
-
-            f1 = 2 * tp / (2 * tp + fp + fn)
-            true_positive_rate = tp / (tp + fn)
-            accuracy = (tp + tn) / (tp + fp + fn + tn)
-
-            f1score.append(f1)
-            tprs.append(true_positive_rate)
-            accuracies.append(accuracy)
-
-        # set certainty threshold where the F1-Score is highest
-        index = np.argmax(f1score)
-        self.certainty_threshold = thresholds[index]
+        predictions = self.classifier.predict(similarities)
 
-        index -= 1
+        if thresholds is None:
+            thresholds = np.arange(0, 1, 0.01)
+        elif isinstance(thresholds, str) and thresholds == "distinct":
+            thresholds = np.unique(predictions)
+        thresholds = np.asarray(thresholds, dtype=float)
+
+        f1score, tprs, accuracies = self.get_threshold_metrics(predictions, true_values, thresholds)
+
+        # set certainty threshold just below the threshold where the F1-Score is highest, if the highest F1-Score is at
+        # the first threshold, the index wraps around to the last threshold
+        index = int(np.argmax(f1score)) - 1
         self.certainty_threshold = thresholds[index]
 
         if visualize:
+            import matplotlib.pyplot as plt
+
             plt.plot(thresholds, f1score, label="F1-Score")
             plt.plot(thresholds, tprs, label="True Positive Rate")
             plt.plot(thresholds, accuracies, label="Accuracy")
@@ -200,66 +416,133 @@ class Pipeline:
         print(f"Certainty threshold was set to {self.certainty_threshold}")
         return self.certainty_threshold
 
-    def get_probabilities(
-            self, input_utterance: str
-    ) -> Tuple[List[Tuple[str, str, float]], Dict[str, List[str]]]:
+    def get_probabilities_batch(
+            self, input_utterances: List[str]
+    ) -> Tuple[ndarray, List[Dict[str, List[str]]]]:
         """
-        Utilizes the pipeline to retrieve the probabilities for all the saved utterances to find the most likely
-        program to be executed.
+        Utilizes the pipeline to retrieve the probabilities for all the saved utterances for many input utterances at
+        once. The input utterances are embedded in one batch, the similarities are calculated as one matrix and the
+        classifier is called once.
 
-        :param input_utterance: utterance to be executed
+        :param input_utterances: utterances to be executed
 
-        :return: dictionary of utterances, their corresponding programs and their probability
+        :return: matrix of probabilities with one row per input utterance and one column per saved utterance, and the
+        entities lifted from each input utterance
         """
         # 1. preprocessing of data
 
         # 2. entity abstraction
-        lifted_utterance, entities = self.entity_abstraction.lift_entities(
-            input_utterance
-        )
-
-        # 3. calculate the embeddings
-        embeddings = self.embedding.embed([lifted_utterance] + self.data.utterances)
+        lifted_utterances = []
+        entities_list = []
+        for input_utterance in input_utterances:
+            lifted_utterance, entities = self.entity_abstraction.lift_entities(input_utterance)
+            lifted_utterances.append(lifted_utterance)
+            entities_list.append(entities)
 
-        input_embedding = embeddings[0]
-        embeddings = embeddings[1:]
+        # 3. calculate the embeddings (the embeddings of the saved utterances are cached)
+        input_embeddings = np.asarray(self.embedding.embed(lifted_utterances)).reshape(len(lifted_utterances), -1)
+        embeddings = self.get_utterance_embeddings()
 
         # 4. calculate similarities
-        similarities = []
-        for embedding in embeddings:
-            sim = self.similarity.calculate(input_embedding, embedding)
-            similarities.append(sim)
+        similarities = self.similarity.calculate_matrix(input_embeddings, embeddings)
 
         # 5. get probabilities from classifier
-        probabilities = self.classifier.predict(np.array(similarities))
+        probabilities = np.asarray(self.classifier.predict(similarities.ravel())).reshape(similarities.shape)
+
+        return probabilities, entities_list
+
+    def get_probabilities(
+            self, input_utterance: str
+    ) -> Tuple[List[Tuple[str, str, float]], Dict[str, List[str]]]:
+        """
+        Utilizes the pipeline to retrieve the probabilities for all the saved utterances to find the most likely
+        program to be executed.
+
+        :param input_utterance: utterance to be executed
+
+        :return: dictionary of utterances, their corresponding programs and their probability
+        """
+        probabilities, entities_list = self.get_probabilities_batch([input_utterance])
 
         results = list(
-            zip(self.data.utterances, self.data.actions, list(probabilities))
+            zip(self.data.utterances, self.data.actions, list(probabilities[0]))
         )
         results.sort(key=lambda tup: tup[2], reverse=True)
 
-        return results, entities
+        return results, entities_list[0]
 
     def get_programs(
-            self, input_utterance: str
+            self, input_utterance: str, top_k: Optional[int] = None
     ) -> List[Dict[str, Union[str, SupportsFloat, Dict[str, Union[str, float, List]]]]]:
         """
         Utilizes the pipeline to get the most probable action (if its probability value is above the certainty threshold
         and uses the recombiner to create the grounded action using the corresponding entities.
 
         :param input_utterance: utterance to parse
+        :param top_k: maximum number of programs, all programs if None
 
         :return: list of possible programs as dictionaries containing the grounded action (combined with entities),
         lifted action (with entity placeholder), action (as returned by get_program) and entities
         """
-        possibilities, entities = self.get_probabilities(
-            input_utterance
-        )  # possibilities = (utterances, actions, probabilities)
+        return self.get_programs_batch([input_utterance], top_k=top_k)[0]
 
-        certain_possibilities = [
-            pos for pos in possibilities if pos[2] >= self.certainty_threshold
-        ]
+    def get_programs_batch(
+            self, input_utterances: List[str], top_k: Optional[int] = None
+    ) -> List[List[Dict[str, Union[str, SupportsFloat, Dict[str, Union[str, float, List]]]]]]:
+        """
+        Like get_programs, but for many utterances at once. The probabilities of all utterances are calculated with
+        get_probabilities_batch and only the most probable utterance of every action above the certainty threshold is
+        recombined, see get_candidates.
+
+        :param input_utterances: utterances to parse
+        :param top_k: maximum number of programs per utterance, all programs if None
+
+        :return: one list of possible programs per input utterance, as returned by get_programs
+        """
+        if not input_utterances:
+            return []
 
+        probabilities, entities_list = self.get_probabilities_batch(input_utterances)
+
+        programs_list = []
+        for row, entities in zip(probabilities, entities_list):
+            candidates = self.get_candidates(row, top_k)
+            programs = self.recombine_programs(self.get_possibilities(row, candidates), entities)
+
+            num_programs = 0 if programs[0]["grounded_action"] == "NOT_SURE" else len(programs)
+            if top_k is not None and len(candidates) == top_k and num_programs < top_k:
+                # some candidates could not be recombined, fall back to all candidates
+                candidates = self.get_candidates(row)
+                programs = self.recombine_programs(self.get_possibilities(row, candidates), entities)[:top_k]
+
+            programs_list.append(programs)
+
+        return programs_list
+
+    def get_possibilities(self, probabilities: ndarray, candidates: List[int]) -> List[Tuple[str, str, float]]:
+        """
+        Returns the (utterance, action, probability) tuples of the given saved utterances.
+
+        :param probabilities: probabilities of all saved utterances for one input utterance
+        :param candidates: indices of the saved utterances
+
+        :return: list of (utterance, action, probability) tuples
+        """
+        return [(self.data.utterances[i], self.data.actions[i], probabilities[i]) for i in candidates]
+
+    def recombine_programs(
+            self, certain_possibilities: List[Tuple[str, str, float]], entities: Dict[str, List[str]]
+    ) -> List[Dict[str, Union[str, SupportsFloat, Dict[str, Union[str, float, List]]]]]:
+        """
+        Uses the recombiner to create the grounded actions of the given possibilities with the entities of the input
+        utterance. Every action is only added once, for its most probable possibility that can be recombined.
+
+        :param certain_possibilities: (utterance, action, probability) tuples above the certainty threshold, sorted by
+          probability
+        :param entities: entities lifted from the input utterance
+
+        :return: list of possible programs, as returned by get_programs
+        """
         action_list: List[Dict[str, Union[str, SupportsFloat, Dict[str, Union[str, float, List]]]]] = []
 
         for possibility in certain_possibilities:
@@ -269,10 +552,7 @@ class Pipeline:
             if any(elem["general_action"] == action for elem in action_list):
                 continue
 
-            (
-                pre_lifted_action,
-                additional_entities,
-            ) = self.entity_abstraction.lift_entities(action)
+            pre_lifted_action, additional_entities = self.get_lifted_action(action)
 
             merged_entities = {
                 "numbers": entities["numbers"] + additional_entities["numbers"],
@@ -316,17 +596,88 @@ class Pipeline:
                 }
             ]
 
-    def save_classifier(self, name: str = "./models/server_classifier.model"):
+    def save_embeddings(self, name: str = "./models/server_embeddings.npz"):
+        """
+        Saves the embeddings of the utterances in self.data together with the utterances, the identifier of the
+        embedding model and the embedding dimension to the specified file.
+
+        :param name: file location for saving the embeddings.
+        """
+        embeddings = self.get_utterance_embeddings()
+        self._write_embeddings(name, self.data.utterances[:len(embeddings)], embeddings)
+
+    def _write_embeddings(self, name: str, utterances: List[str], embeddings: ndarray):
+        """
+        Writes the utterances and their embeddings with the identifier of the embedding model and the embedding
+        dimension to the specified file.
+
+        :param name: file location for saving the embeddings.
+        :param utterances: the embedded utterances
+        :param embeddings: one embedding per utterance
+        """
+        with open(name, "wb") as file:
+            np.savez(
+                file,
+                utterances=np.array(utterances, dtype=str),
+                embeddings=embeddings,
+                model=np.array(self.embedding.identifier),
+                dimension=np.array(embeddings.shape[1]),
+            )
+
+    def load_embeddings(self, name: str = "../models/server_embeddings.npz") -> Optional[ndarray]:
+        """
+        Loads the embeddings saved with save_embeddings and uses them as cache for the utterances in self.data.
+        Embeddings that were saved for another embedding model are discarded.
+        Only the rows for the leading utterances that match self.data are kept, any other utterances are embedded
+        when the embeddings are needed. The file is updated by persist_embeddings, which is called after the first
+        embedding of all utterances, by warmup and by train_classifier.
+
+        :param name: file location where the embeddings are stored.
+
+        :return: the loaded embeddings that match self.data or None if the file does not exist
+        """
+        with self._embeddings_lock:
+            self.embeddings_file = name
+            self._persist_thread = None
+            if not os.path.exists(name):
+                self._num_persisted_embeddings = 0
+                return None
+
+            with np.load(name) as stored:
+                stored_utterances = stored["utterances"].tolist()
+                stored_embeddings = stored["embeddings"]
+                same_model = (
+                    "model" in stored.files
+                    and "dimension" in stored.files
+                    and str(stored["model"]) == self.embedding.identifier
+                    and stored_embeddings.shape[1:] == (int(stored["dimension"]),)
+                )
+
+            if not same_model:
+                stored_utterances = []
+
+            # number of leading utterances which are still the same
+            num_matching = 0
+            for stored_utterance, utterance in zip(stored_utterances, self.data.utterances):
+                if stored_utterance != utterance:
+                    break
+                num_matching += 1
+
+            self._utterance_embeddings = stored_embeddings[:num_matching] if num_matching > 0 else None
+            self._embedded_data = self.data
+            # the file has to be rewritten if it contains other utterances than self.data
+            self._num_persisted_embeddings = num_matching if num_matching == len(stored_utterances) else -1
+            return self._utterance_embeddings
+
+    def save_classifier(self, name: str = "./models/server_classifier.json"):
         """
         Saves the classifier to the specified file.
 
         :param name: file location for saving the model.
         """
-        self.classifier.model.save(name)
+        self.classifier.save(name)
 
-    def load_classifier(
-            self, name: str = "../models/server_classifier.model"
-    ) -> Sequential:
+    def load_classifier(self, name: str = "../models/server_classifier.json") -> Any:
         """
         Loads the classifier from the specified file and updates it in self.classifier.
 
@@ -334,15 +685,9 @@ class Pipeline:
 
         :return: the loaded model
         """
-        self.classifier.model = tensorflow.keras.models.load_model(name)
-        self.classifier.model.compile(
-            optimizer=Adam(learning_rate=0.005),
-            loss=BinaryCrossentropy(),
-            metrics=["accuracy"],
-        )
-        return self.classifier.model
+        return self.classifier.load(name)
 
-    def reset_classifier(self) -> NeuralNet:
+    def reset_classifier(self) -> Classifier:
         """
         Resets the training progress of the classifier and initializes it anew.
 
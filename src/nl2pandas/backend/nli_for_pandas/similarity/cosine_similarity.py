@@ -20,3 +20,21 @@ class CosineSimilarity(Similarity):
         return np.dot(vector1, vector2) / (
             np.linalg.norm(vector1) * np.linalg.norm(vector2)
         )
+
+    def calculate_matrix(self, matrix1: ndarray, matrix2: ndarray) -> ndarray:
+        """
+        Calculates the cosine similarities between all rows of the first and all rows of the second matrix
+        by normalizing the rows once and using a single matrix product.
+
+        :param matrix1: matrix with one vector per row (shape m x d)
+        :param matrix2: matrix with one vector per row (shape n x d)
+
+        :return: matrix of cosine similarities (shape m x n)
+        """
+        matrix1 = np.asarray(matrix1, dtype=float)
+        matrix2 = np.asarray(matrix2, dtype=float)
+
+        normalized1 = matrix1 / np.linalg.norm(matrix1, axis=1, keepdims=True)
+        normalized2 = matrix2 / np.linalg.norm(matrix2, axis=1, keepdims=True)
+
+        return normalized1 @ normalized2.T
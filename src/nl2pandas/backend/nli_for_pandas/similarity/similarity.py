@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
 from numpy import ndarray
 
 
@@ -19,3 +20,29 @@ class Similarity(ABC):
         :return: similarity as a float.
         """
         raise NotImplementedError
+
+    def calculate_matrix(self, matrix1: ndarray, matrix2: ndarray) -> ndarray:
+        """
+        Calculates the similarities between all rows of the first and all rows of the second matrix.
+        Subclasses should override this with a vectorized implementation.
+
+        :param matrix1: matrix with one vector per row (shape m x d)
+        :param matrix2: matrix with one vector per row (shape n x d)
+
+        :return: matrix of similarities (shape m x n)
+        """
+        return np.array(
+            [[self.calculate(vector1, vector2) for vector2 in matrix2] for vector1 in matrix1],
+            dtype=float,
+        ).reshape(len(matrix1), len(matrix2))
+
+    def calculate_many(self, vector: ndarray, matrix: ndarray) -> ndarray:
+        """
+        Calculates the similarities between a vector and all rows of a matrix.
+
+        :param vector: single vector (shape d)
+        :param matrix: matrix with one vector per row (shape n x d)
+
+        :return: array of similarities (shape n)
+        """
+        return self.calculate_matrix(np.asarray(vector).reshape(1, -1), matrix)[0]
@@ -1,12 +1,79 @@
 import base64
-from typing import Any, Dict, List, Optional, Tuple, Union
+import re
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
-import IPython
+import pandas as pd
 from IPython.display import Javascript, display
 from IPython.utils import io
 from nl2pandas.backend.pandas_generator.definitions import DATABASE_PATH  # noqa: E402
 from nl2pandas.backend.pandas_generator.memory.memory import Database
 
+IDENTIFIER = re.compile(r'(?<!\w)[^\W\d]\w*')
+# an identifier followed by one of the characters that mark a dataframe reference
+CELL_REFERENCE = re.compile(r'(?<!\w)([^\W\d]\w*)(?=[ .\[\n=])')
+
+
+class LabelOptions(Sequence):
+    """
+    Read-only view of the labels of a dataframe axis, followed by the option "None". The labels are read from the
+    pd.Index of the dataframe when they are accessed, so no list of all labels is built. Membership checks use
+    the hash table of the index.
+
+    :param labels: the pd.Index with the column or index labels
+    """
+    def __init__(self, labels: pd.Index):
+        self.labels = labels
+
+    def __len__(self) -> int:
+        return len(self.labels) + 1
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+        if item < 0:
+            item += len(self)
+        if item == len(self.labels):
+            return "None"
+        if not 0 <= item < len(self.labels):
+            raise IndexError("label index out of range")
+        return self.labels[item]
+
+    def __iter__(self) -> Iterator:
+        yield from self.labels
+        yield "None"
+
+    def __contains__(self, value) -> bool:
+        if isinstance(value, str) and value == "None":
+            return True
+        return label_in(value, self.labels)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LabelOptions):
+            return self.labels.equals(other.labels)
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return "LabelOptions(%r)" % list(self)
+
+    def copy(self) -> 'LabelOptions':
+        # the view is read-only, so it can be shared
+        return self
+
+
+def label_in(value: Any, labels: pd.Index) -> bool:
+    """
+    Returns True if the value is a label of the index. Unhashable values are never labels.
+
+    :param value: the value to look up
+    :param labels: the pd.Index to look the value up in
+    """
+    try:
+        return value in labels
+    except (TypeError, ValueError):
+        return False
+
 
 class Context:
     def __init__(self, ipython):
@@ -14,13 +81,24 @@ class Context:
         This class manages the current context of the active jupyter notebook session
         """
         self.ipython = ipython
-        self.dataframes: Dict[str, Dict[str, List[Any]]] = {}
+        self.dataframes: Dict[str, Dict[str, pd.Index]] = {}
         self.current_cell: str = ""
         self.current_cell_id: int = 0
         self._active_dataframe: str = ""
-        self.active_df_columns: List[Any] = []
-        self.active_df_indices: List[Any] = []
+        self.active_df_columns: Sequence[Any] = []
+        self.active_df_indices: Sequence[Any] = []
         self.cells: List = []
+        self._last_cell_number = 0
+        self._cell_dfs: Dict[str, Set[str]] = {}
+        self._cell_names: Dict[str, FrozenSet[str]] = {}
+        self._scanned_dfs: Set[str] = set()
+        self._dataframe_signatures: Dict[str, Tuple] = {}
+        self._database: Optional[Database] = None
+
+        # label -> dataframe lookups, rebuilt when the columns or index of a dataframe change
+        self._label_signature: Tuple = ()
+        self._column_dataframes: Dict[Any, List[str]] = {}
+        self._index_dataframes: Dict[Any, List[str]] = {}
 
         self.refiner = None  # activate evaluation_code_generator of dataframe dependent parameters
 
@@ -42,8 +120,8 @@ class Context:
         :param active_dataframe:
         """
         self._active_dataframe = active_dataframe
-        self.active_df_columns = [col for col in self.dataframes[self.active_dataframe]['columns']] + ["None"]
-        self.active_df_indices = [idx for idx in self.dataframes[self.active_dataframe]['indices']] + ["None"]
+        self.active_df_columns = LabelOptions(pd.Index(self.dataframes[self.active_dataframe]['columns']))
+        self.active_df_indices = LabelOptions(pd.Index(self.dataframes[self.active_dataframe]['indices']))
 
         if self.refiner:
             self.refiner.update_df_dependencies()
@@ -56,29 +134,87 @@ class Context:
         """
         self.refiner = refiner
 
-    def is_column_name(self, value: Union[str, List]) -> Tuple[bool, List]:
+    def set_dataframe(self, name: str, dataframe: pd.DataFrame) -> None:
         """
-        Returns True if the given string is a dataframe column name, or if all entries in a list of strings are
-        dataframe column names.
+        Adds a dataframe to the context or replaces the labels of an existing one.
 
-        :param value: dataframe column name
+        :param name: the variable name of the dataframe
+        :param dataframe: the dataframe
+        """
+        self.dataframes[name] = {'columns': dataframe.columns, 'indices': dataframe.index}
 
-        :return: True and the corresponding dataframes or False and an empty list
+    def _update_label_lookups(self) -> None:
         """
-        valid_dfs: List = []
+        Rebuilds the label lookups if the columns or index of a dataframe changed since they were built. Column labels
+        are indexed up front, index labels are looked up in the pd.Index objects on demand and memoized, so that the
+        lookups do not grow with the number of rows.
+        """
+        signature = tuple(
+            (df, id(labels['columns']), id(labels['indices'])) for df, labels in self.dataframes.items()
+        )
+        if signature == self._label_signature:
+            return
+
+        self._label_signature = signature
+        self._column_dataframes = {}
+        self._index_dataframes = {}
         for df in self.dataframes:
+            for label in pd.Index(self.dataframes[df]['columns']).unique():
+                self._column_dataframes.setdefault(label, []).append(df)
+
+    def _get_label_dataframes(self, value: Any, axis: str) -> List[str]:
+        """
+        Returns the dataframes that have the value as a column label or index label.
+
+        :param value: the label
+        :param axis: 'columns' or 'indices'
+        :return: list of dataframe names
+        """
+        try:
+            if axis == 'columns':
+                return self._column_dataframes.get(value, [])
 
-            if isinstance(value, List):
-                if all([item in self.dataframes[df]['columns'] for item in value]):
-                    valid_dfs.append(df)
+            if value not in self._index_dataframes:
+                self._index_dataframes[value] = [
+                    df for df in self.dataframes if label_in(value, pd.Index(self.dataframes[df]['indices']))
+                ]
+            return self._index_dataframes[value]
 
-            elif value in self.dataframes[df]['columns']:
-                valid_dfs.append(df)
+        except TypeError:  # unhashable values are never labels
+            return []
+
+    def _find_label(self, value: Union[str, int, float, List], axis: str) -> Tuple[bool, List]:
+        """
+        Looks up a label, or all labels of a list, in the label lookups of the given axis.
 
-        if valid_dfs:
-            return True, valid_dfs
+        :param value: a label or list of labels
+        :param axis: 'columns' or 'indices'
+        :return: True and the corresponding dataframes or False and an empty list
+        """
+        self._update_label_lookups()
+
+        if isinstance(value, List):
+            valid_dfs = list(self.dataframes)
+            for item in value:
+                item_dfs = self._get_label_dataframes(item, axis)
+                valid_dfs = [df for df in valid_dfs if df in item_dfs]
+                if not valid_dfs:
+                    break
         else:
-            return False, valid_dfs
+            valid_dfs = list(self._get_label_dataframes(value, axis))
+
+        return bool(valid_dfs), valid_dfs
+
+    def is_column_name(self, value: Union[str, List]) -> Tuple[bool, List]:
+        """
+        Returns True if the given string is a dataframe column name, or if all entries in a list of strings are
+        dataframe column names.
+
+        :param value: dataframe column name
+
+        :return: True and the corresponding dataframes or False and an empty list
+        """
+        return self._find_label(value, 'columns')
 
     def is_index(self, value: Union[str, int, float, List]) -> Tuple[bool, List]:
         """
@@ -89,19 +225,7 @@ class Context:
 
         :return: True and the corresponding dataframes or False and an empty list
         """
-        valid_dfs: List = []
-        for df in self.dataframes:
-            if isinstance(value, List):
-                if all([item in self.dataframes[df]['indices'] for item in value]):
-                    valid_dfs.append(df)
-
-            elif value in self.dataframes[df]['indices']:
-                valid_dfs.append(df)
-
-        if valid_dfs:
-            return True, valid_dfs
-        else:
-            return False, valid_dfs
+        return self._find_label(value, 'indices')
 
     def validate_active_df(self, df_label: Union[str, List]):
         """
@@ -126,52 +250,139 @@ class Context:
         """
         update the context based on the current ipython instance. This method must be called after initializing
         the Context class instance, otherwise the attributes will remain empty.
+        The update is incremental: the entries of unchanged dataframes are kept and only the cells executed since
+        the last update are scanned for dataframe references.
 
         :param ipython: the ipython shell instance from the Jupyter notebook
         """
+        if ipython is not self.ipython:
+            self._reset_cell_cache()
         self.ipython = ipython
 
-        # get dataframes
+        # get dataframes, the labels are kept as references to the pd.Index objects of the dataframes
         dfs = ipython.run_line_magic('who_ls', 'DataFrame')
-        self.dataframes = {
-            i: {'columns': ipython.user_ns[i].columns, 'indices': ipython.user_ns[i].index.tolist()} for i in dfs
-        }
+        self.update_dataframes(dfs)
 
         # get active cell
-        cells = [k for k, v in self.ipython.user_ns.items() if k.startswith('_i')]
-        if cells:
-            try:
-                # drop unwanted cells
-                cells.remove('_ih')
-                cells.remove('_i')
-                cells.remove('_ii')
-                cells.remove('_iii')
-
-                self.cells = cells
-                self.current_cell_id = cells[-1]
-                self.current_cell = str(self.ipython.user_ns[cells[-1]])
-
-            except ValueError:
-                pass
+        new_cells = self.get_new_cells()
+        self.cells.extend(new_cells)
+        if self.cells:
+            self.current_cell_id = self.cells[-1]
+            self.current_cell = str(self.ipython.user_ns[self.cells[-1]])
         else:
             self.current_cell_id = 0
             self.current_cell = ''
 
         # if active dataframe emtpy, set as default to last referenced dataframe
-        cell_df = self.get_cell_df(df_list=dfs, cell_list=cells)
+        self.update_cell_dfs(df_list=dfs, new_cells=new_cells)
 
-        db = Database(file=DATABASE_PATH)
-        saved_df = db.load('active_dataframe')
+        saved_df = self.database.load('active_dataframe')
 
         if saved_df is not None and saved_df in self.dataframes:
             self.active_dataframe = saved_df
 
-        elif cell_df is not None:
-            try:
-                last_ref = list(cell_df.keys())[-1]
-                self.active_dataframe = cell_df[last_ref][0]
-            except IndexError:
-                pass
+        else:
+            last_ref = self.get_last_referenced_df(df_list=dfs)
+            if last_ref is not None:
+                self.active_dataframe = last_ref
+
+    @property
+    def database(self) -> Database:
+        """
+        The database with the saved actions, opened once per context.
+        """
+        if self._database is None:
+            self._database = Database(file=DATABASE_PATH)
+        return self._database
+
+    def _reset_cell_cache(self) -> None:
+        self.cells = []
+        self._last_cell_number = 0
+        self._cell_dfs = {}
+        self._cell_names = {}
+        self._scanned_dfs = set()
+
+    def update_dataframes(self, df_list: List[str]) -> None:
+        """
+        Updates the dataframe entries of the given dataframe names. The entry of a dataframe is only replaced if
+        the dataframe object, its shape, its index or its columns changed.
+
+        :param df_list: list of existing dataframe names
+        """
+        dataframes = {}
+        signatures = {}
+        for df in df_list:
+            dataframe = self.ipython.user_ns[df]
+            signature = (id(dataframe), dataframe.shape, id(dataframe.index), id(dataframe.columns))
+            if df in self.dataframes and self._dataframe_signatures.get(df) == signature:
+                dataframes[df] = self.dataframes[df]
+            else:
+                dataframes[df] = {'columns': dataframe.columns, 'indices': dataframe.index}
+            signatures[df] = signature
+
+        self.dataframes = dataframes
+        self._dataframe_signatures = signatures
+
+    def get_new_cells(self) -> List[str]:
+        """
+        Returns the input cells (_i1, _i2, ...) that were executed since the last call.
+
+        :return: list of cell ids
+        """
+        new_cells = []
+        user_ns = self.ipython.user_ns
+        number = self._last_cell_number + 1
+        while number <= self.ipython.execution_count:
+            if '_i%d' % number in user_ns:
+                new_cells.append('_i%d' % number)
+                self._last_cell_number = number
+            number += 1
+        return new_cells
+
+    def update_cell_dfs(self, df_list: List[str], new_cells: List[str]) -> None:
+        """
+        Updates the dataframe references of the cells. New cells are scanned for all dataframes, the previously
+        scanned cells only for dataframes that did not exist at the time of the last scan.
+
+        :param df_list: list of existing dataframe names
+        :param new_cells: the cells executed since the last update
+        """
+        new_dfs = [df for df in df_list if df not in self._scanned_dfs]
+        updates = [self.get_cell_df(df_list=df_list, cell_list=new_cells)]
+        if new_dfs:
+            old_cells = self.cells[:len(self.cells) - len(new_cells)]
+            updates.append(self.get_cell_df(df_list=new_dfs, cell_list=old_cells))
+
+        for update in updates:
+            for cell, dfs in update.items():
+                self._cell_dfs.setdefault(cell, set()).update(dfs)
+        self._scanned_dfs = set(df_list)
+
+    def get_last_referenced_df(self, df_list: List[str]) -> Optional[str]:
+        """
+        Returns the first existing dataframe referenced in the last cell that references one, in the order of
+        df_list, or None.
+
+        :param df_list: list of existing dataframe names
+        """
+        for cell in reversed(self.cells):
+            if self._cell_dfs.get(cell):
+                for df in df_list:
+                    if df in self._cell_dfs[cell]:
+                        return df
+        return None
+
+    def get_cell_names(self, cell: str) -> FrozenSet[str]:
+        """
+        Returns the names referenced in a cell, that is every identifier followed by a space, '.', '[', a line break
+        or '='. The cell is scanned once, the result is memoized per cell id because executed cells do not change.
+
+        :param cell: the cell id. Example: _i1
+        :return: set of referenced names
+        """
+        if cell not in self._cell_names:
+            self._cell_names[cell] = frozenset(CELL_REFERENCE.findall(str(self.ipython.user_ns[cell])))
+        return self._cell_names[cell]
 
     def get_cell_df(self, df_list: List[str], cell_list: List[str]) -> Dict[str, List[str]]:
         """
@@ -185,19 +396,11 @@ class Context:
         df_cells: Dict[str, List[str]] = dict()
 
         for cell in cell_list:
-            for df in df_list:
-                # does not exclude commented out dataframe references
-                if (
-                    self.ipython.user_ns[cell].rfind(df+' ') != -1
-                    or self.ipython.user_ns[cell].rfind(df+'.') != -1
-                    or self.ipython.user_ns[cell].rfind(df+'[') != -1
-                    or self.ipython.user_ns[cell].rfind(df+'\n') != -1
-                    or self.ipython.user_ns[cell].rfind(df+'=') != -1
-                ):
-                    if cell not in df_cells.keys():
-                        df_cells[cell] = [df]
-                    else:
-                        df_cells[cell].append(df)
+            # does not exclude commented out dataframe references
+            names = self.get_cell_names(cell)
+            cell_dfs = [df for df in df_list if df in names]
+            if cell_dfs:
+                df_cells[cell] = cell_dfs
 
         return df_cells
 
@@ -223,43 +426,98 @@ class Context:
                 {1};
             """.format(encoded_code, ex)))
 
-    def validate_function(self, function: str) -> Tuple[bool, Optional[Exception]]:
+    def validate_function(self, function: str, sample_size: Optional[int] = 100,
+                          dry_run: bool = False) -> Tuple[bool, Optional[Exception]]:
         """
-        Run executable pandas code in user namespace and catch and return any exceptions.
-        Important: copying the user namespace to a new kernel was not possible, therefore this method
-        saves the dataframes before running the pandas code, then loads the dataframes again to restore the previous
-        state. Upon loading, the dataframe variables are removed from the storage so that they do not persist into
-        following Jupyter notebook sessions. This might cause conflicts if a user is utilizing the storage magic to save
-        their kernel session!
+        Run executable pandas code and catch and return any exceptions. The code runs in a copy of the user
+        namespace in which the referenced dataframes are replaced by copies of their first sample_size rows, so
+        neither the user namespace nor the dataframes are changed and the validation time does not depend on the
+        size of the data. If the code fails on the samples with an error that the sampling can cause, i.e. a row
+        label or position that is not part of the samples (see is_sampling_error), it is run again on full copies of
+        the referenced dataframes. Other objects of the namespace are not copied.
+
+        With dry_run, the code only runs on zero-row dataframes with the columns and dtypes of the referenced
+        dataframes and is not run again. This catches column name, keyword and dtype errors in nearly constant time,
+        but code that selects row labels fails, because the zero-row dataframes have no rows.
+
+        :param function: the pandas code to validate
+        :param sample_size: the number of rows copied from each referenced dataframe, or None to copy all rows
+        :param dry_run: validate against the schema of the referenced dataframes only
 
         :return: A boolean indicating the execution status and the exception message
         """
-        temp_ipython = IPython.InteractiveShell.instance()
-        temp_ipython.push(self.ipython.user_ns)
+        if dry_run:
+            return self._execute_on_copies(function, 0)
+
+        success, exception = self._execute_on_copies(function, sample_size)
+
+        if not success and sample_size is not None:
+            sampled = [
+                self.ipython.user_ns[df] for df in self.get_referenced_dataframes(function)
+                if len(self.ipython.user_ns[df]) > sample_size
+            ]
+            if sampled and self.is_sampling_error(exception, sampled):
+                success, exception = self._execute_on_copies(function, None)
+
+        return success, exception
 
-        # save current dataframes state to restore after validation
-        if self.dataframes:
-            dfs = "%s" % " ".join([key for key in self.dataframes])
+    @staticmethod
+    def is_sampling_error(exception: Optional[Exception], dataframes: List[pd.DataFrame]) -> bool:
+        """
+        Checks whether an exception raised on the samples of the dataframes might be caused by the sampling: an
+        IndexError of a row position, or a KeyError of a row label of the full dataframes. Other errors, e.g. a
+        misspelled column name, are raised on the full dataframes as well.
+
+        :param exception: the exception raised on the samples
+        :param dataframes: the sampled dataframes
+        :return: whether the code has to be run on the full dataframes
+        """
+        if isinstance(exception, IndexError):
+            return True
+        if not isinstance(exception, KeyError) or not exception.args:
+            return False
+
+        label = exception.args[0]
+        # messages of missing row labels, e.g. "[250] not found in axis" (drop), "None of [...] are in the [index]"
+        # and "[250] not in index" (loc with a list, also raised for a list of missing columns)
+        if isinstance(label, str) and (
+                label.endswith('not found in axis') or label.endswith('are in the [index]')
+                or label.endswith('not in index')
+        ):
+            return True
+        try:
+            return any(label in dataframe.index for dataframe in dataframes)
+        except TypeError:  # unhashable label
+            return False
+
+    def get_referenced_dataframes(self, function: str) -> List[str]:
+        """
+        Returns the dataframes of the context that are referenced in the code.
 
+        :param function: the pandas code
+        :return: list of dataframe names
+        """
+        names = set(IDENTIFIER.findall(function))
+        return [df for df in self.dataframes if df in names and df in self.ipython.user_ns]
+
+    def _execute_on_copies(self, function: str, sample_size: Optional[int]) -> Tuple[bool, Optional[Exception]]:
+        """
+        Executes the code in a copy of the user namespace, with copies of the first sample_size rows (or of all rows)
+        of the referenced dataframes.
+
+        :param function: the pandas code to execute
+        :param sample_size: the number of rows to copy, or None to copy all rows
+        :return: A boolean indicating the execution status and the exception message
+        """
+        namespace = dict(self.ipython.user_ns)
+        for df in self.get_referenced_dataframes(function):
+            dataframe = self.ipython.user_ns[df]
+            namespace[df] = dataframe.copy() if sample_size is None else dataframe.head(sample_size).copy()
+
+        try:
             with io.capture_output():
-                temp_ipython.run_line_magic('store', dfs)
-
-            try:
-                with io.capture_output():
-                    temp_ipython.ex(function)
-                    temp_ipython.run_line_magic('store', '-r ' + dfs)
-                    temp_ipython.run_line_magic('store', '-d ' + dfs)  # removes the stored value from storage entirely!
-                return True, None
-
-            except Exception as exception:
-                temp_ipython.run_line_magic('store', '-r ' + dfs)
-                temp_ipython.run_line_magic('store', '-d ' + dfs)
-                return False, exception
-        else:
-            try:
-                with io.capture_output():
-                    temp_ipython.ex(function)
-                return True, None
+                exec(compile(function, '<validation>', 'exec'), namespace)
+            return True, None
 
-            except Exception as exception:
-                return False, exception
+        except Exception as exception:
+            return False, exception
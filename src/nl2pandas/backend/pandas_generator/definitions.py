@@ -2,7 +2,9 @@ import os
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 
-CLASSIFIER_PATH = os.path.abspath(os.path.join(ROOT_DIR, '..', 'models', 'server_classifier.model'))
+CLASSIFIER_PATH = os.path.abspath(os.path.join(ROOT_DIR, '..', 'models', 'server_classifier.json'))
+
+EMBEDDINGS_PATH = os.path.abspath(os.path.join(ROOT_DIR, '..', 'models', 'server_embeddings.npz'))
 
 DATABASE_PATH = os.path.abspath(os.path.join(ROOT_DIR, 'memory', 'past_actions.sqlite3'))
 
@@ -1,5 +1,6 @@
 import inspect
 import operator
+from functools import lru_cache
 from typing import Any, Callable, Dict, List, SupportsFloat, Union, cast
 
 from nl2pandas.backend.nli_for_pandas.entity_abstraction.combiner import Combiner
@@ -8,12 +9,30 @@ from nl2pandas.backend.pandas_generator.context.context import Context
 from nl2pandas.backend.pandas_generator.definitions import (  # noqa: E402
     CLASSIFIER_PATH,
     DATABASE_PATH,
+    EMBEDDINGS_PATH,
 )
 from nl2pandas.backend.pandas_generator.memory.memory import Database
 from nl2pandas.backend.pandas_generator.refiner.refiner import Refiner
 from nl2pandas.backend.pandas_generator.translator.translator import Translator
 
 
+@lru_cache(maxsize=None)
+def get_cached_documentation(pandas_func: Callable) -> str:
+    """
+    Returns the documentation of a given callable object. The documentation is rendered once per callable and
+    process.
+
+    :param pandas_func: the Pandas function to document
+    :return: string containing the documentation
+    """
+    doc = inspect.getdoc(pandas_func)
+
+    if doc is None:
+        doc = 'missing documentation'
+
+    return doc
+
+
 class PandasManager:
     """
     This class acts as an entry point to the pandas_generator backend. From here, one can access the
@@ -26,6 +45,7 @@ class PandasManager:
         self.pandas_translator = Translator()
         self.pipeline = Pipeline()
         self.pipeline.load_classifier(CLASSIFIER_PATH)
+        self.pipeline.load_embeddings(EMBEDDINGS_PATH)
         self.combiner = Combiner()
 
     def validate_entity_sequence(self,
@@ -83,12 +103,10 @@ class PandasManager:
 
         :return: string containing the documentation
         """
-        doc = inspect.getdoc(pandas_func)
-
-        if doc is None:
-            doc = 'missing documentation'
-
-        return doc
+        try:
+            return get_cached_documentation(pandas_func)
+        except TypeError:  # unhashable callable
+            return get_cached_documentation.__wrapped__(pandas_func)
 
     def get_translation(
             self,
@@ -119,6 +137,8 @@ class PandasManager:
             pandas_translation['probability'] = round(float(probability)*100, 2)
 
             pandas_translation['grounded_action'] = program['grounded_action']
+            pandas_translation['general_action'] = program['general_action']
+            pandas_translation['entities'] = program['entities']
             pandas_translation['nl_utterance'] = utterance
 
             pandas_translation['documentation'] = self.get_documentation(pandas_translation['class_callable'])
@@ -135,8 +155,36 @@ class PandasManager:
         :return: a list of dictionary holding relevant pandas and dsl information for the dsl programs
         """
         # get programs
-        programs = self.pipeline.get_programs(utterance)[:4]
+        programs = self.pipeline.get_programs(utterance, top_k=4)
+
+        return self.get_programs_info(programs, utterance)
+
+    def get_programs_batch(self, utterances: List[str]) -> List[List[Dict]]:
+        """
+        Like get_programs, but for many utterances at once. The pipeline translates all utterances in one batch.
+
+        :param utterances: the natural language utterances
+        :return: one list of dictionaries per utterance, as returned by get_programs
+        """
+        if not utterances:
+            return []
 
+        programs_list = self.pipeline.get_programs_batch(utterances, top_k=4)
+
+        return [
+            self.get_programs_info(programs, utterance)
+            for programs, utterance in zip(programs_list, utterances)
+        ]
+
+    def get_programs_info(self, programs: List[Dict], utterance: str) -> List[Dict]:
+        """
+        Validates the programs retrieved from the natural language interface pipeline and matches them to the
+        pandas methods.
+
+        :param programs: the programs suggested by the nl pipeline for the utterance
+        :param utterance: the natural language utterance
+        :return: a list of dictionary holding relevant pandas and dsl information for the dsl programs
+        """
         try:
             list(map(operator.itemgetter('grounded_action'), programs)).index('NOT_SURE')
             return [{'grounded_action': 'NOT_SURE'}]
@@ -150,6 +198,36 @@ class PandasManager:
 
         return programs_info
 
+    def get_program_record(self, program_info: Dict) -> Dict[str, Any]:
+        """
+        Returns the parts of a program, as returned by get_programs, that are needed to restore it with
+        restore_program. The record only holds literals, so it can be stored as a string and read back with
+        ast.literal_eval.
+
+        :param program_info: the dictionary holding the dsl and pandas info of the program
+        :return: the program record
+        """
+        return {
+            'general_action': program_info['general_action'],
+            'entities': dict(program_info['entities']),
+            'grounded_action': program_info['grounded_action'],
+            'general_pandas_function': program_info['general_pandas_function'],
+            'probability': program_info['probability']
+        }
+
+    def restore_program(self, record: Dict[str, Any], utterance: str) -> Dict[str, Any]:
+        """
+        Rebuilds a program from a record of get_program_record without running the NLI pipeline.
+
+        :param record: the program record
+        :param utterance: the natural language utterance the program was generated for
+        :return: the dictionary holding the dsl and pandas info of the program, as returned by get_programs
+        """
+        program = dict(record)
+        # get_translation expects the probability of the pipeline, the record holds the percentage
+        program['probability'] = float(record['probability']) / 100
+        return self.get_translation(programs=[program], utterance=utterance)[0]
+
     def get_refiner(self, selected_program: Dict) -> Refiner:
         """
         Sets up the refiner instance for a specific pandas function
@@ -1,5 +1,6 @@
 import inspect
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
 from nl2pandas.backend.pandas_generator.code_generator.code_generator import (
     CodeGenerator,
@@ -7,6 +8,110 @@ from nl2pandas.backend.pandas_generator.code_generator.code_generator import (
 from nl2pandas.backend.pandas_generator.context.context import Context
 
 
+def get_static_param_options(parameters: Dict[str, Dict[str, Optional[Any]]]) -> Dict[str, Dict[str, Optional[Any]]]:  # noqa: C901
+    """
+    Loosely determines the parameter options that do not depend on the dataframes based on data type and adds them
+    to the dictionary. The options of dataframe dependent parameters are left as they are, see
+    Refiner.get_df_param_options.
+
+    :param parameters: a nested dictionary holding the parameters and their additional info
+    :return: a dictionary with available parameters and their options.
+    """
+    for param in parameters:
+
+        if param == 'axis':
+            parameters[param]['value'] = 'index'
+            parameters[param]['options'] = ["columns", "index"]
+            parameters[param]['selection'] = 'dropdown'
+            parameters[param]['dtype'] = 'axis'
+
+        elif isinstance(parameters[param]['value'], bool) or parameters[param]['dtype'] == 'bool':
+            if parameters[param]['options'] is None:
+                parameters[param]['options'] = ["True", "False"]
+            if parameters[param]['selection'] is None:
+                parameters[param]['selection'] = 'dropdown'
+
+        elif parameters[param]['dtype'] in ['DataFrame_axis', 'DataFrame_axis_opposite', 'DataFrame_columns',
+                                            'DataFrame_index']:
+            if parameters[param]['selection'] is None:
+                parameters[param]['selection'] = 'dropdown'
+
+        elif parameters[param]['dtype'] == 'number':
+            if parameters[param]['selection'] is None:
+                parameters[param]['selection'] = 'number'
+
+        elif param in ['args', 'kwargs'] or "<class 'inspect._empty'>" in str(parameters[param]['value']):
+            parameters[param]['value'] = ''
+            parameters[param]['selection'] = 'text'
+
+        else:
+            if parameters[param]['selection'] is None:
+                parameters[param]['selection'] = 'text'
+
+    return parameters
+
+
+def build_static_function_parameters(pandas_func: Callable, param_specs: Mapping) -> Dict[str, Dict[str, Any]]:
+    """
+    Uses the inspect feature to create a dictionary of available parameters for a pandas function, with the
+    parameter specifications and the options that do not depend on the dataframes.
+
+    :param pandas_func: a pandas function to inspect
+    :param param_specs: a dictionary of parameter options specific to a function
+    :return: dictionary of available parameters
+    """
+    parameters = {}
+    signature = inspect.signature(pandas_func)
+
+    for param in signature.parameters:
+        parameters[param] = {
+            "value": signature.parameters[param].default,
+            "dtype": signature.parameters[param].annotation,
+            "options": None,
+            "selection": None
+        }
+
+    parameters.pop('self', None)
+
+    # set any specified parameter options, the specifications of the translator are read-only
+    for param in param_specs:
+        for value in param_specs[param]:
+            if value in parameters[param]:
+                spec = param_specs[param][value]
+                parameters[param][value] = list(spec) if isinstance(spec, tuple) else spec
+
+    # get options and selection types
+    return get_static_param_options(parameters)
+
+
+# static parameters per pandas function and identity of the frozen parameter specifications, the specifications are
+# kept with the parameters so that their identity is not reused
+_static_function_parameters: Dict[Tuple[Callable, int], Tuple[Mapping, Dict[str, Dict[str, Any]]]] = {}
+
+
+def get_static_function_parameters(pandas_func: Callable, param_specs: Mapping) -> Dict[str, Dict[str, Any]]:
+    """
+    Cached version of build_static_function_parameters. Parameter specifications frozen by the Translator (see
+    translator.freeze) are read-only and shared by all translations of a DSL action, so the result is cached per
+    function and identity of the specifications. Other specifications can change and are not cached.
+    The returned dictionary is shared and must not be changed.
+
+    :param pandas_func: a pandas function to inspect
+    :param param_specs: a dictionary of parameter options specific to a function
+    :return: dictionary of available parameters
+    """
+    if not isinstance(param_specs, MappingProxyType):
+        return build_static_function_parameters(pandas_func, param_specs)
+
+    key = (pandas_func, id(param_specs))
+    cached = _static_function_parameters.get(key)
+    if cached is None or cached[0] is not param_specs:
+        cached = (param_specs, build_static_function_parameters(pandas_func, param_specs))
+        _static_function_parameters[key] = cached
+
+    return cached[1]
+
+
 class Refiner:
     """
     This class manages the parameters, context and scope of a single Pandas method.
@@ -161,7 +266,9 @@ class Refiner:
                     except IndexError:
                         print("No DataFrame context found. Are there existing DataFrames in the Code?")
             else:
-                if str(self.refined_kwargs[param]) not in str(self.parameters[param]['options']):
+                value = self.refined_kwargs[param]
+                options = self.parameters[param]['options']
+                if value not in options and str(value) not in options:
                     ref_kwargs = self.refined_kwargs.copy()
                     # ref_kwargs[param] = self.parameters[param]['value']  # set to default None
                     try:
@@ -182,7 +289,7 @@ class Refiner:
 
         self.executable_function = self.code_generator.get_function_string(**self.kwargs)
 
-    def get_param_options(self, parameters: Dict[str, Dict[str, Optional[Any]]]) -> Dict[str, Dict[str, Optional[Any]]]:  # noqa: C901
+    def get_param_options(self, parameters: Dict[str, Dict[str, Optional[Any]]]) -> Dict[str, Dict[str, Optional[Any]]]:
         """
         Loosely determines the parameter options based on data type and adds them to the dictionary
 
@@ -197,55 +304,23 @@ class Refiner:
             'errors': {'value': 'raise', 'type': 'str', 'options': None, 'selection': 'text'}
             }
         """
-        for param in parameters:
-
-            if param == 'axis':
-                parameters[param]['value'] = 'index'
-                parameters[param]['options'] = ["columns", "index"]
-                parameters[param]['selection'] = 'dropdown'
-                parameters[param]['dtype'] = 'axis'
+        return self.get_df_param_options(get_static_param_options(parameters))
 
-            elif isinstance(parameters[param]['value'], bool) or parameters[param]['dtype'] == 'bool':
-                if parameters[param]['options'] is None:
-                    parameters[param]['options'] = ["True", "False"]
-                if parameters[param]['selection'] is None:
-                    parameters[param]['selection'] = 'dropdown'
-
-            elif parameters[param]['dtype'] == 'DataFrame_axis':
-                if parameters[param]['options'] is None:
-                    parameters[param]['options'] = self.context.active_df_columns
-                if parameters[param]['selection'] is None:
-                    parameters[param]['selection'] = 'dropdown'
-
-            elif parameters[param]['dtype'] == 'DataFrame_axis_opposite':
-                if parameters[param]['options'] is None:
-                    parameters[param]['options'] = self.context.active_df_columns
-                if parameters[param]['selection'] is None:
-                    parameters[param]['selection'] = 'dropdown'
+    def get_df_param_options(self, parameters: Dict[str, Dict[str, Optional[Any]]]) -> Dict[str, Dict[str, Optional[Any]]]:
+        """
+        Sets the options of the dataframe dependent parameters without options to the labels of the active
+        dataframe.
 
-            elif parameters[param]['dtype'] == 'DataFrame_columns':
-                if parameters[param]['options'] is None:
+        :param parameters: a nested dictionary holding the parameters and their additional info, as returned by
+            get_static_param_options
+        :return: the parameters with the dataframe dependent options
+        """
+        for param in parameters:
+            if parameters[param]['options'] is None:
+                if parameters[param]['dtype'] in ('DataFrame_axis', 'DataFrame_axis_opposite', 'DataFrame_columns'):
                     parameters[param]['options'] = self.context.active_df_columns
-                if parameters[param]['selection'] is None:
-                    parameters[param]['selection'] = 'dropdown'
-
-            elif parameters[param]['dtype'] == 'DataFrame_index':
-                if parameters[param]['options'] is None:
+                elif parameters[param]['dtype'] == 'DataFrame_index':
                     parameters[param]['options'] = self.context.active_df_indices
-                if parameters[param]['selection'] is None:
-                    parameters[param]['selection'] = 'dropdown'
-
-            elif parameters[param]['dtype'] == 'number':
-                if parameters[param]['selection'] is None:
-                    parameters[param]['selection'] = 'number'
-
-            elif param in ['args', 'kwargs'] or "<class 'inspect._empty'>" in str(parameters[param]['value']):
-                parameters[param]['value'] = ''
-                parameters[param]['selection'] = 'text'
-
-            else:
-                if parameters[param]['selection'] is None:
-                    parameters[param]['selection'] = 'text'
 
         return parameters
 
@@ -253,6 +328,8 @@ class Refiner:
         """
         Uses the inspect feature to create a dictionary of available parameters for a
         pandas function and sets the values to either the default value or those given by the user.
+        The part of the dictionary that does not depend on the dataframes is cached per function and
+        frozen parameter specifications, each call gets a copy of it.
 
         :param pandas_func: a pandas function to inspect
         :param param_specs: a dictionary of parameter options specific to a function
@@ -260,29 +337,18 @@ class Refiner:
         :return: dictionary of available parameters with either their default values
         or the values set by the user
         """
-        parameters = {}
-        signature = inspect.signature(pandas_func)
-
-        for param in signature.parameters:
-            parameters[param] = {
-                "value": signature.parameters[param].default,
-                "dtype": signature.parameters[param].annotation,
-                "options": None,
-                "selection": None
-            }
-
-        parameters.pop('self', None)
-
-        # set any specified parameter options
-        for param in param_specs:
-            for value in param_specs[param]:
-                if value in parameters[param]:
-                    parameters[param][value] = param_specs[param][value]
-
-        # get options and selection types
-        parameters = self.get_param_options(parameters)
-
-        return parameters
+        try:
+            static_parameters = get_static_function_parameters(pandas_func, param_specs)
+        except TypeError:  # unhashable callable
+            static_parameters = build_static_function_parameters(pandas_func, param_specs)
+
+        parameters = {
+            param: {
+                key: list(value) if isinstance(value, list) else value for key, value in info.items()
+            } for param, info in static_parameters.items()
+        }
+
+        return self.get_df_param_options(parameters)
 
     def get_scope_options(self, scope_options: List, scope: Dict) -> Dict[str, Dict[str, str]]:
         """
@@ -1,8 +1,508 @@
 import json
-from typing import Any, Dict, List, Set, Union
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple, Union
 
 import pandas as pd
 
+Entities = Dict[str, Union[str, float, List]]
+
+
+def freeze(value: Any) -> Any:
+    """
+    Returns a read-only version of nested dictionaries and lists: dictionaries become MappingProxyType objects and
+    lists become tuples.
+
+    :param value: the value to freeze
+    :return: the frozen value
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class ProgramSpec(NamedTuple):
+    """
+    The static part of a translation, shared by all calls of Translator.get_pandas_func for the DSL actions it is
+    registered for.
+
+    :param general_pandas_function: the name of the pandas function
+    :param class_callable: the callable Pandas method object
+    :param type: the type of the Pandas method
+    :param parameter_specifications: the frozen parameter specifications, see freeze
+    :param scope_options: the scope options for this method
+    :param build: builds the kwargs and the scope of a call from the entities
+    :param include_general_action: whether the translation contains the key general_action
+    """
+    general_pandas_function: str
+    class_callable: Optional[Callable]
+    type: str
+    parameter_specifications: Mapping[str, Mapping[str, Any]]
+    scope_options: Tuple[str, ...]
+    build: Callable[[Entities], Tuple[Dict[str, Any], Dict[str, Any]]]
+    include_general_action: bool = False
+
+
+def program_spec(
+        general_pandas_function: str,
+        class_callable: Optional[Callable],
+        type: str,
+        build: Callable[[Entities], Tuple[Dict[str, Any], Dict[str, Any]]],
+        parameter_specifications: Optional[Dict[str, Dict[str, Any]]] = None,
+        scope_options: Iterable[str] = (),
+        include_general_action: bool = False
+) -> ProgramSpec:
+    """
+    Creates a ProgramSpec and freezes its parameter specifications.
+    """
+    return ProgramSpec(
+        general_pandas_function=general_pandas_function,
+        class_callable=class_callable,
+        type=type,
+        parameter_specifications=freeze(parameter_specifications or {}),
+        scope_options=tuple(scope_options),
+        build=build,
+        include_general_action=include_general_action
+    )
+
+
+def no_kwargs(entities: Entities) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    return {}, {}
+
+
+def subset_col(entities: Entities) -> Dict[str, Dict[str, Any]]:
+    return {'subset_col': {'value': entities['<value0>']}}
+
+
+def build_head(entities: Entities) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    return (dict(n=entities['<number0>']) if entities else {}), {}
+
+
+def build_dropna(entities: Entities) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    return (dict(subset=entities['<value0>']) if entities else {}), {}
+
+
+def build_fillna(entities: Entities) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    try:
+        return dict(value=entities['<value0>']), {}
+    except KeyError:
+        return dict(value=entities['<number0>']), {}
+
+
+def build_astype(entities: Entities) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    if len(entities) == 2:
+        return dict(dtype=entities['<value1>']), subset_col(entities)
+    return dict(dtype=entities['<value0>']), {}
+
+
+def build_round(entities: Entities) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    kwargs = dict(decimals=entities['<number0>'])
+    if len(entities) == 2:
+        return kwargs, subset_col(entities)
+    return kwargs, {}
+
+
+def build_rename(entities: Entities) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    mapper: Union[Dict, Set]
+    if len(entities) == 2:
+        mapper = {entities['<value0>']: entities['<value1>']}
+    else:
+        try:
+            assert isinstance(entities['<value0>'], str)
+            string_dict = entities['<value0>'].replace("'", '"')
+            mapper = json.loads(string_dict)
+        except Exception:
+            mapper = {entities['<value0>']}
+
+    return dict(mapper=mapper, axis="columns"), {}
+
+
+def build_melt(entities: Entities) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    return (dict(id_vars=entities['<string_list0>']) if entities else {}), {}
+
+
+def build_filter(entities: Entities) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    try:
+        return dict(items=[entities['<value0>']], axis='columns'), {}
+    except KeyError:
+        return dict(items=entities['<string_list0>'], axis='columns'), {}
+
+
+def build_assign(entities: Entities) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    return (dict(kwargs=entities['<value0>']) if entities else {}), {}
+
+
+def build_groupby(entities: Entities) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    try:
+        return dict(by=entities['<value0>'], axis='columns'), {}
+    except KeyError:
+        return dict(by=entities['<string_list0>'], axis="columns"), {}
+
+
+def build_to_csv(entities: Entities) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    return (dict(path_or_buf=entities['<value0>']) if entities else {}), {}
+
+
+def build_drop_columns(entities: Entities) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    if not entities:
+        return dict(axis='columns'), {}
+    try:
+        return dict(labels=entities['<value0>'], axis='columns'), {}
+    except KeyError:
+        return dict(labels=entities['<string_list0>'], axis='columns'), {}
+
+
+def build_drop_rows(entities: Entities) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    if '<number0>' in entities:
+        return dict(labels=entities['<number0>'], axis="index"), {}
+    elif '<number_list0>' in entities:
+        return dict(labels=entities['<number_list0>'], axis="index"), {}
+    return {}, {}
+
+
+def build_split(entities: Entities) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    kwargs = dict(pat=entities['<value1>']) if len(entities) == 2 else {}
+    return kwargs, subset_col(entities)
+
+
+def build_replace(entities: Entities) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    if entities:
+        return dict(pat=entities['<value1>'], repl=entities['<value2>']), subset_col(entities)
+    return {}, {}
+
+
+def build_extract(entities: Entities) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    if entities:
+        return dict(pat=entities['<value1>']), subset_col(entities)
+    return {}, {}
+
+
+# the DSL actions supported by default, see Translator.get_pandas_func
+PROGRAM_SPECS: Dict[str, ProgramSpec] = {}
+
+
+def register_default(dsl_actions: Iterable[str], spec: ProgramSpec) -> None:
+    for dsl_action in dsl_actions:
+        PROGRAM_SPECS[dsl_action] = spec
+
+
+register_default(["CONVERT <value> TO DATETIME"], program_spec(
+    general_pandas_function="to_datetime",
+    class_callable=pd.to_datetime,
+    type="general_pandas",
+    build=lambda entities: (dict(arg=entities['<value0>']), {}),
+    parameter_specifications={
+        'arg': {'dtype': 'multi_type'},
+        'errors': {'selection': 'dropdown', 'options': ['raise', 'coerce', 'ignore']},
+        'utc': {'dtype': 'bool'},
+    },
+    include_general_action=True
+))
+
+register_default(["CONVERT <value> TO NUMERIC"], program_spec(
+    general_pandas_function="to_numeric",
+    class_callable=pd.to_numeric,
+    type="general_pandas",
+    build=lambda entities: (dict(arg=entities['<value0>']), {}),
+    parameter_specifications={
+        'arg': {'dtype': 'multi_type'},
+        'errors': {'selection': 'dropdown', 'options': ['raise', 'coerce', 'ignore']},
+    },
+    include_general_action=True
+))
+
+register_default(["READ <value> AS CSV"], program_spec(
+    general_pandas_function="read_csv",
+    class_callable=pd.read_csv,
+    type="general_pandas",
+    build=lambda entities: (dict(filepath_or_buffer=entities['<value0>']), {}),
+    parameter_specifications={
+        # 'filepath_or_buffer': {'dtype': 'multi_type'},
+        'header': {'dtype': 'int'},
+        'index_col': {'dtype': 'multi_type'},
+        'usecols': {'dtype': 'multi_type'},
+        'dtype': {'dtype': 'multi_type'},
+        'engine': {'selection': 'dropdown', 'options': ['c', 'python', 'pyarrow']},
+        'skiprows': {'dtype': 'multi_type'},
+        'na_values': {'dtype': 'multi_type'},
+        'parse_dates': {'dtype': 'multi_type'},
+        'compression': {'dtype': 'multi_type'},
+        'quoting': {'dtype': 'multi_type'},
+        'dialect': {'dtype': 'multi_type'},
+        'on_bad_lines': {'selection': 'dropdown', 'options': ['error', 'warn', 'skip']},
+        'prefix': {'dtype': 'text', 'value': ''},
+        'sep': {'dtype': 'text', 'value': ','},
+        'names': {'dtype': 'multy_type', 'value': ''},
+
+    },
+    include_general_action=True
+))
+
+register_default(["SHOW INFORMATION"], program_spec(
+    general_pandas_function="info",
+    class_callable=pd.DataFrame.info,
+    type="pandas.DataFrame",
+    build=no_kwargs,
+    parameter_specifications={
+        'verbose': {'dtype': 'bool'},
+        'memory_usage': {'dtype': 'bool'},
+        'show_counts': {'dtype': 'bool'}}
+))
+
+register_default(["DESCRIBE DATAFRAME"], program_spec(
+    general_pandas_function="describe",
+    class_callable=pd.DataFrame.describe,
+    type="pandas.DataFrame",
+    build=no_kwargs
+))
+
+register_default(["SHOW FIRST <number> ROWS", "SHOW FIRST ROWS"], program_spec(
+    general_pandas_function="head",
+    class_callable=pd.DataFrame.head,
+    type="pandas.DataFrame",
+    build=build_head,
+    parameter_specifications={
+        'n': {'dtype': 'number'},
+    },
+    scope_options=['subset_col']
+))
+
+register_default(["SHOW MISSING VALUES"], program_spec(
+    general_pandas_function="isnull",
+    class_callable=pd.DataFrame.isnull,
+    type="pandas.DataFrame",
+    build=no_kwargs
+))
+
+register_default(["DROP MISSING VALUES", "DROP MISSING VALUES FROM <value>"], program_spec(
+    general_pandas_function="dropna",
+    class_callable=pd.DataFrame.dropna,
+    type="pandas.DataFrame",
+    build=build_dropna,
+    parameter_specifications={
+        'how': {'selection': 'dropdown', 'options': ['any', 'all']},
+        'thresh': {'dtype': 'number'},
+        'subset': {'dtype': 'DataFrame_axis_opposite', 'selection': 'dropdown_multi'},
+    }
+))
+
+# 'FILLL' is the spelling of the action in the training data
+register_default(['FILL MISSING VALUES WITH <value>', 'FILLL MISSING VALUES WITH <number>'], program_spec(
+    general_pandas_function="fillna",
+    class_callable=pd.DataFrame.fillna,
+    type="pandas.DataFrame",
+    build=build_fillna,
+    parameter_specifications={
+        'method': {'selection': 'dropdown', 'options': ['backfill', 'bfill', 'pad', 'ffill', None]},
+        'limit': {'dtype': 'number'},
+        'downcast': {'dtype': 'multi_type'}
+    },
+    scope_options=['subset_col']
+))
+
+register_default(['DROP DUPLICATE VALUES'], program_spec(
+    general_pandas_function="drop_duplicates",
+    class_callable=pd.DataFrame.drop_duplicates,
+    type="pandas.DataFrame",
+    build=no_kwargs,
+    parameter_specifications={
+        'subset': {'dtype': 'DataFrame_axis', 'selection': 'dropdown_multi'},
+        'keep': {'selection': 'dropdown', 'options': ['first', 'last', False]},
+    }
+))
+
+register_default(['CHANGE DATATYPE TO <value>', 'ON COLUMN <value> CHANGE DATATYPE TO <value>'], program_spec(
+    general_pandas_function="astype",
+    class_callable=pd.DataFrame.astype,
+    type="pandas.DataFrame",
+    build=build_astype,
+    parameter_specifications={
+        'errors': {'selection': 'dropdown', 'options': ['raise', 'ignore']},
+    },
+    scope_options=['subset_col']
+))
+
+register_default(['ROUND TO <number> DECIMAL POINTS', 'ON COLUMN <value> ROUND TO <number> DECIMAL POINTS'],
+                 program_spec(
+                     general_pandas_function="round",
+                     class_callable=pd.DataFrame.round,
+                     type="pandas.DataFrame",
+                     build=build_round,
+                     scope_options=['subset_col']
+                 ))
+
+register_default(['RENAME <value> TO <value>', 'RENAME COLUMNS TO <value>'], program_spec(
+    general_pandas_function="rename",
+    class_callable=pd.DataFrame.rename,
+    type="pandas.DataFrame",
+    build=build_rename,
+    parameter_specifications={'mapper': {'dtype': 'multi_type'}, 'level': {'dtype': 'number'}}
+))
+
+register_default(['MELT DATAFRAME', 'MELT DATAFRAME WITH <string_list> AS COLUMNS'], program_spec(
+    general_pandas_function="melt",
+    class_callable=pd.DataFrame.melt,
+    type="pandas.DataFrame",
+    build=build_melt,
+    parameter_specifications={
+        'id_vars': {'dtype': 'DataFrame_columns', 'selection': 'dropdown_multi'},
+        'value_vars': {'dtype': 'DataFrame_columns', 'selection': 'dropdown_multi'},
+    }
+))
+
+register_default(['FILTER FOR COLUMN <value>', 'FILTER FOR COLUMN <string_list>'], program_spec(
+    general_pandas_function="filter",
+    class_callable=pd.DataFrame.filter,
+    type="pandas.DataFrame",
+    build=build_filter,
+    parameter_specifications={
+        'items': {'dtype': 'DataFrame_axis', 'selection': 'dropdown_multi'},
+    }
+))
+
+register_default(['SET INDEX TO <value>'], program_spec(
+    general_pandas_function="set_index",
+    class_callable=pd.DataFrame.set_index,
+    type="pandas.DataFrame",
+    build=lambda entities: (dict(keys=entities['<value0>']), {}),
+    parameter_specifications={
+        'keys': {'dtype': 'DataFrame_axis'},
+    }
+))
+
+register_default(['RESET INDEX'], program_spec(
+    general_pandas_function="reset_index",
+    class_callable=pd.DataFrame.reset_index,
+    type="pandas.DataFrame",
+    build=no_kwargs
+))
+
+register_default(['SORT VALUES BY <value>'], program_spec(
+    general_pandas_function="sort_values",
+    class_callable=pd.DataFrame.sort_values,
+    type="pandas.DataFrame",
+    build=lambda entities: (dict(by=entities['<value0>'], axis="index", inplace=True), {}),
+    parameter_specifications={
+        'by': {'dtype': 'DataFrame_axis_opposite', 'selection': 'dropdown_multi'},
+        'kind': {'selection': 'dropdown', 'options': ['quicksort', 'mergesort', 'heapsort', 'stable']},
+        'na_position': {'selection': 'dropdown', 'options': ['first', 'last']}}
+))
+
+register_default(['ASSIGN NEW COLUMN', 'ASSIGN NEW COLUMN AS <value>'], program_spec(
+    general_pandas_function="assign",
+    class_callable=pd.DataFrame.assign,
+    type="pandas.DataFrame",
+    build=build_assign
+))
+
+register_default(['GROUP BY COLUMN <value>', 'GROUP BY COLUMN <string_list>'], program_spec(
+    general_pandas_function="groupby",
+    class_callable=pd.DataFrame.groupby,
+    type="pandas.DataFrame",
+    build=build_groupby,
+    parameter_specifications={
+        'by': {'dtype': 'DataFrame_axis', 'selection': 'dropdown_multi'},
+        'level': {'dtype': 'number'},
+        'squeeze': {'dtype': 'bool', 'value': False},  # incorrect in signature
+    }
+))
+
+register_default(['AGGREGATE USING <value>'], program_spec(
+    general_pandas_function="agg",
+    class_callable=pd.DataFrame.agg,
+    type="pandas.DataFrame",
+    build=lambda entities: (dict(func=entities['<value0>']), {}),
+    scope_options=['subset_col']
+))
+
+register_default(['SAVE TO CSV', 'SAVE TO CSV AS <value>'], program_spec(
+    general_pandas_function="to_csv",
+    class_callable=pd.DataFrame.to_csv,
+    type="pandas.DataFrame",
+    build=build_to_csv
+))
+
+register_default(['DELETE COLUMN <value>', 'DELETE COLUMN', 'DELETE COLUMN <string_list>'], program_spec(
+    general_pandas_function="drop",
+    class_callable=pd.DataFrame.drop,
+    type="pandas.DataFrame",
+    build=build_drop_columns,
+    parameter_specifications={
+        'labels': {'dtype': 'DataFrame_axis', 'selection': 'dropdown_multi'},
+        'index': {'dtype': 'DataFrame_axis'},
+        'columns': {'dtype': 'DataFrame_columns'},
+        'level': {'dtype': 'number'},
+    }
+))
+
+register_default(['DELETE ROW <number>', 'DELETE ROWS <number_list>', 'DELETE ROWS'], program_spec(
+    general_pandas_function="drop",
+    class_callable=pd.DataFrame.drop,
+    type="pandas.DataFrame",
+    build=build_drop_rows,
+    parameter_specifications={'labels': {'dtype': 'DataFrame_axis', 'selection': 'dropdown_multi'},
+                              'level': {'dtype': 'number'}}
+))
+
+register_default(['ON COLUMN <value> STRIP <value>'], program_spec(
+    general_pandas_function="str.strip",
+    class_callable=pd.Series.str.strip,
+    type="pandas.Series",
+    build=lambda entities: (dict(to_strip=entities['<value1>']), subset_col(entities)),
+    scope_options=['subset_col']
+))
+
+register_default(["ON COLUMN <value> SPLIT ON <value>", "SPLIT ON COLUMN <value>"], program_spec(
+    general_pandas_function="str.split",
+    class_callable=pd.Series.str.split,
+    type="pandas.Series",
+    build=build_split,
+    parameter_specifications={
+        'n': {'dtype': 'number'},
+        'regex': {'dtype': 'bool'}
+    },
+    scope_options=['subset_col']
+))
+
+register_default(['ON COLUMN <value> REPLACE <value> WITH <value>', 'REPLACE VALUES'], program_spec(
+    general_pandas_function="str.replace",
+    class_callable=pd.Series.str.replace,
+    type="pandas.Series",
+    build=build_replace,
+    parameter_specifications={
+        'n': {'dtype': 'number'},
+        'regex': {'dtype': 'bool'},
+        'case': {'dtype': 'bool'},
+        'flags': {'dtype': 'number'}
+    },
+    scope_options=['subset_col']
+))
+
+register_default(["ON COLUMN <value> JOIN ON <value>"], program_spec(
+    general_pandas_function="str.join",
+    class_callable=pd.Series.str.join,
+    type="pandas.Series",
+    build=lambda entities: (dict(sep=entities['<value1>']), subset_col(entities)),
+    scope_options=['subset_col']
+))
+
+register_default(["ON COLUMN <value> EXTRACT <value>", "EXTRACT VALUES"], program_spec(
+    general_pandas_function="str.extract",
+    class_callable=pd.Series.str.extract,
+    type="pandas.Series",
+    build=build_extract,
+    scope_options=['subset_col']
+))
+
+register_default(["GET UNIQUE VALUES FROM <value>"], program_spec(
+    general_pandas_function="unique",
+    class_callable=pd.Series.unique,
+    type="pandas.Series",
+    build=lambda entities: ({}, subset_col(entities)),
+    scope_options=['subset_col']
+))
+
 
 class Translator:
     def __init__(self):
@@ -10,11 +510,25 @@ class Translator:
         This class matches a given DSL to a Pandas method, and provides all the necessary information needed to
         generate pandas code and refine the method
         """
+        self.program_specs: Dict[str, ProgramSpec] = dict(PROGRAM_SPECS)
 
-    def get_pandas_func(self, dsl_action: str, entities: Dict[str, Union[str, float, List]]) -> Dict[str, Any]:  # noqa: C901
+    def register(self, dsl_actions: Union[str, Iterable[str]], spec: ProgramSpec) -> None:
+        """
+        Adds DSL actions to this translator, or replaces the translation of existing ones.
+
+        :param dsl_actions: a DSL action or a list of DSL actions that translate to the same pandas function
+        :param spec: the spec of the pandas function, as created by program_spec
+        """
+        if isinstance(dsl_actions, str):
+            dsl_actions = [dsl_actions]
+        for dsl_action in dsl_actions:
+            self.program_specs[dsl_action] = spec
+
+    def get_pandas_func(self, dsl_action: str, entities: Dict[str, Union[str, float, List]]) -> Dict[str, Any]:
         """
         Finds the pandas function corresponding to the given DSL action.
-        Methods can be added by specifying the return dictionary:
+        Methods can be added with register, by specifying a ProgramSpec with the static parts of the return
+        dictionary and a build function, which returns the kwargs and the scope for the entities:
             - general_action: the general DSL action
             - general_pandas_function: the name of the pandas function
             - class_callable: the callable Pandas method object
@@ -45,6 +559,8 @@ class Translator:
                 - 'subset_col'
                 - 'subset_index'
 
+        The parameter specifications are shared by all calls and read-only, the other values are created per call.
+
         :param dsl_action: the DSL action
         :param entities: a dictionary of parameter keywords with their values set to the given entities
         :return: Dictionary with the pandas function, the string expression of the pandas function,
@@ -66,527 +582,9 @@ class Translator:
             |  "scope": {},
         }
         """
-        kwargs: Dict[str, Any]
-
-        if dsl_action == "CONVERT <value> TO DATETIME":
-            kwargs = dict(arg=entities['<value0>'])
-            return {
-                "general_action": dsl_action,
-                "general_pandas_function": "to_datetime",
-                "class_callable": pd.to_datetime,
-                "kwargs": kwargs,
-                "type": "general_pandas",
-                "parameter_specifications": {
-                    'arg': {'dtype': 'multi_type'},
-                    'errors': {'selection': 'dropdown', 'options': ['raise', 'coerce', 'ignore']},
-                    'utc': {'dtype': 'bool'},
-                },
-                "scope_options": [],
-                "scope": {}
-            }
-
-        elif dsl_action == "CONVERT <value> TO NUMERIC":
-            kwargs = dict(arg=entities['<value0>'])
-            return {
-                "general_action": dsl_action,
-                "general_pandas_function": "to_numeric",
-                "class_callable": pd.to_numeric,
-                "kwargs": kwargs,
-                "type": "general_pandas",
-                "parameter_specifications": {
-                    'arg': {'dtype': 'multi_type'},
-                    'errors': {'selection': 'dropdown', 'options': ['raise', 'coerce', 'ignore']},
-                },
-                "scope_options": [],
-                "scope": {}
-            }
+        spec = self.program_specs.get(dsl_action)
 
-        elif dsl_action == "READ <value> AS CSV":
-            kwargs = dict(filepath_or_buffer=entities['<value0>'])
-            return {
-                "general_action": dsl_action,
-                "general_pandas_function": "read_csv",
-                "class_callable": pd.read_csv,
-                "kwargs": kwargs,
-                "type": "general_pandas",
-                "parameter_specifications": {
-                    # 'filepath_or_buffer': {'dtype': 'multi_type'},
-                    'header': {'dtype': 'int'},
-                    'index_col': {'dtype': 'multi_type'},
-                    'usecols': {'dtype': 'multi_type'},
-                    'dtype': {'dtype': 'multi_type'},
-                    'engine': {'selection': 'dropdown', 'options': ['c', 'python', 'pyarrow']},
-                    'skiprows': {'dtype': 'multi_type'},
-                    'na_values': {'dtype': 'multi_type'},
-                    'parse_dates': {'dtype': 'multi_type'},
-                    'compression': {'dtype': 'multi_type'},
-                    'quoting': {'dtype': 'multi_type'},
-                    'dialect': {'dtype': 'multi_type'},
-                    'on_bad_lines': {'selection': 'dropdown', 'options': ['error', 'warn', 'skip']},
-                    'prefix': {'dtype': 'text', 'value': ''},
-                    'sep': {'dtype': 'text', 'value': ','},
-                    'names': {'dtype': 'multy_type', 'value': ''},
-
-                },
-                "scope_options": [],
-                "scope": {}
-            }
-
-        elif dsl_action == "SHOW INFORMATION":
-
-            return {
-                "general_pandas_function": "info",
-                "class_callable": pd.DataFrame.info,
-                "kwargs": {},
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {
-                    'verbose': {'dtype': 'bool'},
-                    'memory_usage': {'dtype': 'bool'},
-                    'show_counts': {'dtype': 'bool'}},
-                "scope_options": [],
-                "scope": {}
-            }
-
-        elif dsl_action == "DESCRIBE DATAFRAME":
-            return {
-                "general_pandas_function": "describe",
-                "class_callable": pd.DataFrame.describe,
-                "kwargs": {},
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {},
-                "scope_options": [],
-                "scope": {}
-            }
-
-        elif dsl_action in ["SHOW FIRST <number> ROWS", "SHOW FIRST ROWS"]:
-            if entities:
-                kwargs = dict(n=entities['<number0>'])
-            else:
-                kwargs = {}
-            return {
-                "general_pandas_function": "head",
-                "class_callable": pd.DataFrame.head,
-                "kwargs": kwargs,
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {
-                    'n': {'dtype': 'number'},
-                },
-                "scope_options": ['subset_col'],
-                "scope": {}
-            }
-
-        elif dsl_action == "SHOW MISSING VALUES":
-            return {
-                "general_pandas_function": "isnull",
-                "class_callable": pd.DataFrame.isnull,
-                "kwargs": {},
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {},
-                "scope_options": [],
-                "scope": {}
-            }
-
-        elif dsl_action in ["DROP MISSING VALUES", "DROP MISSING VALUES FROM <value>"]:
-            kwargs = dict()
-            if entities:
-                kwargs = dict(subset=entities['<value0>'])
-            return {
-                "general_pandas_function": "dropna",
-                "class_callable": pd.DataFrame.dropna,
-                "kwargs": kwargs,
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {
-                    'how': {'selection': 'dropdown', 'options': ['any', 'all']},
-                    'thresh': {'dtype': 'number'},
-                    'subset': {'dtype': 'DataFrame_axis_opposite', 'selection': 'dropdown_multi'},
-                },
-                "scope_options": [],
-                "scope": {}
-            }
-
-        elif dsl_action in ['FILL MISSING VALUES WITH <value>', 'FILLL MISSING VALUES WITH <number>']:
-            try:
-                kwargs = dict(value=entities['<value0>'])
-            except KeyError:
-                kwargs = dict(value=entities['<number0>'])
-
-            return {
-                "general_pandas_function": "fillna",
-                "class_callable": pd.DataFrame.fillna,
-                "kwargs": kwargs,
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {
-                    'method': {'selection': 'dropdown', 'options': ['backfill', 'bfill', 'pad', 'ffill', None]},
-                    'limit': {'dtype': 'number'},
-                    'downcast': {'dtype': 'multi_type'}
-                },
-                "scope_options": ['subset_col'],
-                "scope": {}
-            }
-
-        elif dsl_action in 'DROP DUPLICATE VALUES':
-            return {
-                "general_pandas_function": "drop_duplicates",
-                "class_callable": pd.DataFrame.drop_duplicates,
-                "kwargs": {},
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {
-                    'subset': {'dtype': 'DataFrame_axis', 'selection': 'dropdown_multi'},
-                    'keep': {'selection': 'dropdown', 'options': ['first', 'last', False]},
-                },
-                "scope_options": [],
-                "scope": {}
-            }
-
-        elif dsl_action in ['CHANGE DATATYPE TO <value>', 'ON COLUMN <value> CHANGE DATATYPE TO <value>']:
-
-            if len(entities) == 2:
-                kwargs = dict(dtype=entities['<value1>'])
-                scope = dict(subset_col={'value': entities['<value0>']})
-            else:
-                kwargs = dict(dtype=entities['<value0>'])
-                scope = dict()
-
-            return {
-                "general_pandas_function": "astype",
-                "class_callable": pd.DataFrame.astype,
-                "kwargs": kwargs,
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {
-                    'errors': {'selection': 'dropdown', 'options': ['raise', 'ignore']},
-                },
-                "scope_options": ['subset_col'],
-                "scope": scope
-            }
-
-        elif dsl_action in ['ROUND TO <number> DECIMAL POINTS', 'ON COLUMN <value> ROUND TO <number> DECIMAL POINTS']:
-            kwargs = dict(decimals=entities['<number0>'])
-            scope = dict()
-
-            if len(entities) == 2:
-                kwargs = dict(decimals=entities['<number0>'])
-                scope = dict(subset_col={'value': entities['<value0>']})
-
-            return {
-                "general_pandas_function": "round",
-                "class_callable": pd.DataFrame.round,
-                "kwargs": kwargs,
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {},
-                "scope_options": ['subset_col'],
-                "scope": scope
-            }
-
-        elif dsl_action in ['RENAME <value> TO <value>', 'RENAME COLUMNS TO <value>']:
-            mapper: Union[Dict, Set]
-            if len(entities) == 2:
-                mapper = {entities['<value0>']: entities['<value1>']}
-            else:
-                try:
-                    assert isinstance(entities['<value0>'], str)
-                    string_dict = entities['<value0>'].replace("'", '"')
-                    mapper = json.loads(string_dict)
-                except Exception:
-                    mapper = {entities['<value0>']}
-
-            kwargs = dict(mapper=mapper, axis="columns")
-
-            return {
-                "general_pandas_function": "rename",
-                "class_callable": pd.DataFrame.rename,
-                "kwargs": kwargs,
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {'mapper': {'dtype': 'multi_type'}, 'level': {'dtype': 'number'}},
-                "scope_options": [],
-                "scope": {}
-            }
-
-        elif dsl_action in ['MELT DATAFRAME', 'MELT DATAFRAME WITH <string_list> AS COLUMNS']:
-            kwargs = dict()
-            if entities:
-                kwargs = dict(id_vars=entities['<string_list0>'])
-
-            return {
-                "general_pandas_function": "melt",
-                "class_callable": pd.DataFrame.melt,
-                "kwargs": kwargs,
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {
-                    'id_vars': {'dtype': 'DataFrame_columns', 'selection': 'dropdown_multi'},
-                    'value_vars': {'dtype': 'DataFrame_columns', 'selection': 'dropdown_multi'},
-                },
-                "scope_options": [],
-                "scope": {}
-            }
-
-        elif dsl_action in ['FILTER FOR COLUMN <value>', 'FILTER FOR COLUMN <string_list>']:
-            try:
-                kwargs = dict(items=[entities['<value0>']], axis='columns')
-            except KeyError:
-                kwargs = dict(items=entities['<string_list0>'], axis='columns')
-            return {
-                "general_pandas_function": "filter",
-                "class_callable": pd.DataFrame.filter,
-                "kwargs": kwargs,
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {
-                    'items': {'dtype': 'DataFrame_axis', 'selection': 'dropdown_multi'},
-                },
-                "scope_options": [],
-                "scope": {}
-            }
-
-        elif dsl_action == 'SET INDEX TO <value>':
-            kwargs = dict(keys=entities['<value0>'])
-            return {
-                "general_pandas_function": "set_index",
-                "class_callable": pd.DataFrame.set_index,
-                "kwargs": kwargs,
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {
-                    'keys': {'dtype': 'DataFrame_axis'},
-                },
-                "scope_options": [],
-                "scope": {}
-            }
-
-        elif dsl_action == 'RESET INDEX':
-
-            return {
-                "general_pandas_function": "reset_index",
-                "class_callable": pd.DataFrame.reset_index,
-                "kwargs": {},
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {},
-                "scope_options": [],
-                "scope": {}
-            }
-
-        elif dsl_action == 'SORT VALUES BY <value>':
-            kwargs = dict(by=entities['<value0>'], axis="index", inplace=True)
-
-            return {
-                "general_pandas_function": "sort_values",
-                "class_callable": pd.DataFrame.sort_values,
-                "kwargs": kwargs,
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {
-                    'by': {'dtype': 'DataFrame_axis_opposite', 'selection': 'dropdown_multi'},
-                    'kind': {'selection': 'dropdown', 'options': ['quicksort', 'mergesort', 'heapsort', 'stable']},
-                    'na_position': {'selection': 'dropdown', 'options': ['first', 'last']}},
-                "scope_options": [],
-                "scope": {}
-            }
-
-        elif dsl_action in ['ASSIGN NEW COLUMN', 'ASSIGN NEW COLUMN AS <value>']:
-            kwargs = dict()
-            if entities:
-                kwargs = dict(kwargs=entities['<value0>'])
-
-            return {
-                "general_pandas_function": "assign",
-                "class_callable": pd.DataFrame.assign,
-                "kwargs": kwargs,
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {},
-                "scope_options": [],
-                "scope": {}
-            }
-
-        elif dsl_action in ['GROUP BY COLUMN <value>', 'GROUP BY COLUMN <string_list>']:
-            try:
-                kwargs = dict(by=entities['<value0>'], axis='columns')
-            except KeyError:
-                kwargs = dict(by=entities['<string_list0>'], axis="columns")
-
-            return {
-                "general_pandas_function": "groupby",
-                "class_callable": pd.DataFrame.groupby,
-                "kwargs": kwargs,
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {
-                    'by': {'dtype': 'DataFrame_axis', 'selection': 'dropdown_multi'},
-                    'level': {'dtype': 'number'},
-                    'squeeze': {'dtype': 'bool', 'value': False},  # incorrect in signature
-                },
-                "scope_options": [],
-                "scope": {}
-            }
-
-        elif dsl_action == 'AGGREGATE USING <value>':
-            kwargs = dict(func=entities['<value0>'])
-
-            return {
-                "general_pandas_function": "agg",
-                "class_callable": pd.DataFrame.agg,
-                "kwargs": kwargs,
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {},
-                "scope_options": ['subset_col'],
-                "scope": {}
-            }
-
-        elif dsl_action in ['SAVE TO CSV', 'SAVE TO CSV AS <value>']:
-            if entities:
-                kwargs = dict(path_or_buf=entities['<value0>'])
-            else:
-                kwargs = dict()
-
-            return {
-                "general_pandas_function": "to_csv",
-                "class_callable": pd.DataFrame.to_csv,
-                "kwargs": kwargs,
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {},
-                "scope_options": [],
-                "scope": {}
-            }
-
-        elif dsl_action in ['DELETE COLUMN <value>', 'DELETE COLUMN', 'DELETE COLUMN <string_list>']:
-            if entities:
-                try:
-                    kwargs = dict(labels=entities['<value0>'], axis='columns')
-                except KeyError:
-                    kwargs = dict(labels=entities['<string_list0>'], axis='columns')
-            else:
-                kwargs = dict(axis='columns')
-
-            return {
-                "general_pandas_function": "drop",
-                "class_callable": pd.DataFrame.drop,
-                "kwargs": kwargs,
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {
-                    'labels': {'dtype': 'DataFrame_axis', 'selection': 'dropdown_multi'},
-                    'index': {'dtype': 'DataFrame_axis'},
-                    'columns': {'dtype': 'DataFrame_columns'},
-                    'level': {'dtype': 'number'},
-                },
-                "scope_options": [],
-                "scope": {},
-            }
-
-        elif dsl_action in ['DELETE ROW <number>', 'DELETE ROWS <number_list>', 'DELETE ROWS']:
-
-            if '<number0>' in entities:
-                kwargs = dict(labels=entities['<number0>'], axis="index")
-            elif '<number_list0>' in entities:
-                kwargs = dict(labels=entities['<number_list0>'], axis="index")
-            else:
-                kwargs = dict()
-
-            return {
-                "general_pandas_function": "drop",
-                "class_callable": pd.DataFrame.drop,
-                "kwargs": kwargs,
-                "type": "pandas.DataFrame",
-                "parameter_specifications": {'labels': {'dtype': 'DataFrame_axis', 'selection': 'dropdown_multi'},
-                                             'level': {'dtype': 'number'}},
-                "scope_options": [],
-                "scope": {}
-
-            }
-
-        elif dsl_action == 'ON COLUMN <value> STRIP <value>':
-            scope = {'subset_col': {'value': entities['<value0>']}}
-            kwargs = dict(to_strip=entities['<value1>'])
-
-            return {
-                "general_pandas_function": "str.strip",
-                "class_callable": pd.Series.str.strip,
-                "kwargs": kwargs,
-                "type": "pandas.Series",
-                "parameter_specifications": {},
-                "scope_options": ['subset_col'],
-                "scope": scope
-            }
-
-        elif dsl_action in ["ON COLUMN <value> SPLIT ON <value>", "SPLIT ON COLUMN <value>"]:
-            kwargs = dict()
-            scope = {'subset_col': {'value': entities['<value0>']}}
-
-            if len(entities) == 2:
-                kwargs = dict(pat=entities['<value1>'])
-
-            return {
-                "general_pandas_function": "str.split",
-                "class_callable": pd.Series.str.split,
-                "kwargs": kwargs,
-                "type": "pandas.Series",
-                "parameter_specifications": {
-                    'n': {'dtype': 'number'},
-                    'regex': {'dtype': 'bool'}
-                },
-                "scope_options": ['subset_col'],
-                "scope": scope
-            }
-
-        elif dsl_action in ['ON COLUMN <value> REPLACE <value> WITH <value>', 'REPLACE VALUES']:
-            kwargs = dict()
-            scope = dict()
-            if entities:
-                kwargs = dict(pat=entities['<value1>'], repl=entities['<value2>'])
-                scope = {'subset_col': {'value': entities['<value0>']}}
-
-            return {
-                "general_pandas_function": "str.replace",
-                "class_callable": pd.Series.str.replace,
-                "kwargs": kwargs,
-                "type": "pandas.Series",
-                "parameter_specifications": {
-                    'n': {'dtype': 'number'},
-                    'regex': {'dtype': 'bool'},
-                    'case': {'dtype': 'bool'},
-                    'flags': {'dtype': 'number'}
-                },
-                "scope_options": ['subset_col'],
-                "scope": scope
-            }
-
-        elif dsl_action == "ON COLUMN <value> JOIN ON <value>":
-            kwargs = dict(sep=entities['<value1>'])
-            scope = {'subset_col': {'value': entities['<value0>']}}
-
-            return {
-                "general_pandas_function": "str.join",
-                "class_callable": pd.Series.str.join,
-                "kwargs": kwargs,
-                "type": "pandas.Series",
-                "parameter_specifications": {},
-                "scope_options": ['subset_col'],
-                "scope": scope
-            }
-
-        elif dsl_action in ["ON COLUMN <value> EXTRACT <value>", "EXTRACT VALUES"]:
-            kwargs = dict()
-            scope = dict()
-            if entities:
-                kwargs = dict(pat=entities['<value1>'])
-                scope = {'subset_col': {'value': entities['<value0>']}}
-
-            return {
-                "general_pandas_function": "str.extract",
-                "class_callable": pd.Series.str.extract,
-                "kwargs": kwargs,
-                "type": "pandas.Series",
-                "parameter_specifications": {},
-                "scope_options": ['subset_col'],
-                "scope": scope
-            }
-        elif dsl_action == "GET UNIQUE VALUES FROM <value>":
-            scope = {'subset_col': {'value': entities['<value0>']}}
-
-            return {
-                "general_pandas_function": "unique",
-                "class_callable": pd.Series.unique,
-                "kwargs": {},
-                "type": "pandas.Series",
-                "parameter_specifications": {},
-                "scope_options": ['subset_col'],
-                "scope": scope
-            }
-
-        else:
+        if spec is None:
             return {
                 "general_pandas_function": "not implemented",
                 "class_callable": None,
@@ -596,3 +594,17 @@ class Translator:
                 "scope_options": [],
                 "scope": {}
             }
+
+        kwargs, scope = spec.build(entities)
+
+        program: Dict[str, Any] = {"general_action": dsl_action} if spec.include_general_action else {}
+        program.update({
+            "general_pandas_function": spec.general_pandas_function,
+            "class_callable": spec.class_callable,
+            "kwargs": kwargs,
+            "type": spec.type,
+            "parameter_specifications": spec.parameter_specifications,
+            "scope_options": list(spec.scope_options),
+            "scope": scope
+        })
+        return program
@@ -0,0 +1,43 @@
+import os
+import unittest
+
+import numpy as np
+from nl2pandas.backend.nli_for_pandas.classifier.logistic_regression import (
+    LogisticRegression,
+)
+
+
+class TestLogisticRegression(unittest.TestCase):
+    def setUp(self):
+        self.classifier = LogisticRegression()
+        self.input = np.array([0.1, 0.2, 0.3, 0.45, 0.55, 0.7, 0.8, 0.9])
+        self.target = np.array([0, 0, 0, 1, 0, 1, 1, 1])
+
+    def test_train(self):
+        history = self.classifier.train(self.input, self.target)
+        self.assertIsNotNone(history)
+        self.assertTrue(self.classifier.a > 0)
+        self.assertEqual(history["accuracy"][-1], 0.75)
+
+    def test_train_matches_gradient_condition(self):
+        self.classifier.train(self.input, self.target, epochs=50)
+        probabilities = self.classifier.predict(self.input)
+        # the gradient of the (slightly regularized) cross entropy vanishes at the optimum
+        self.assertAlmostEqual(np.sum(probabilities - self.target), 0, places=2)
+
+    def test_predict(self):
+        prediction = self.classifier.predict([1])
+        self.assertTrue(0 <= prediction <= 1)
+
+        predictions = LogisticRegression(a=10, b=-5).predict(np.array([0, 0.5, 1]))
+        self.assertEqual(predictions.shape, (3,))
+        assert np.allclose(predictions, 1 / (1 + np.exp(-np.array([-5, 0, 5]))))
+
+    def test_save_and_load(self):
+        LogisticRegression(a=16.5, b=-8.9).save("./test_classifier.json")
+        loaded = self.classifier.load("./test_classifier.json")
+        self.assertEqual((loaded.a, loaded.b), (16.5, -8.9))
+
+    def tearDown(self):
+        if os.path.exists("./test_classifier.json"):
+            os.remove("./test_classifier.json")
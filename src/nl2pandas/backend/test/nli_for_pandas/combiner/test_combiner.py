@@ -138,3 +138,25 @@ class TestCombiner(unittest.TestCase):
         self.assertEqual("name", ordered_entities.get("<value0>"))
         self.assertIn("<value1>", ordered_entities)
         self.assertEqual("state", ordered_entities.get("<value1>"))
+
+    def test_recombine_mismatched_entity_types(self):
+        action = "SELECT ROWS WHERE <value> <number> <number>"
+        entities = {
+            "numbers": ["1"],
+            "values": ["a", "b"],
+            "number_lists": [],
+            "string_lists": [],
+            "conditions": [],
+        }
+
+        with self.assertRaises(Exception):
+            self.combiner.recombine(action, entities)
+
+    def test_templates_cached(self):
+        action = "RENAME <value> TO <value> "
+        template = self.combiner.get_template(action)
+
+        self.assertEqual(["RENAME ", " TO ", " "], template.parts)
+        self.assertEqual([("value", 0), ("value", 1)], template.slots)
+        self.assertEqual((0, 2, 0, 0, 0), template.signature)
+        self.assertIs(template, self.combiner.get_template(action))
@@ -1,5 +1,8 @@
+import itertools
+import re
 import unittest
 
+from nl2pandas.backend.nli_for_pandas.data.data import Data
 from nl2pandas.backend.nli_for_pandas.entity_abstraction.entity_abstraction import (
     EntityAbstraction,
 )
@@ -104,6 +107,68 @@ class TestEntityAbstraction(unittest.TestCase):
         self.assertEqual(expected_utterance, lifted_utterance)
         self.assertEqual(expected_entities, entities)
 
+    def test_lift_entities_apostrophe(self):
+        # lists are lifted before values, so a value can not start at the apostrophe and swallow the list
+        input_utterance = "drop the user's columns ['a', 'b']"
+        expected_utterance = "drop the user's columns [<string_list>]"
+        expected_entities = {
+            "numbers": [],
+            "values": [],
+            "number_lists": [],
+            "string_lists": ["'a', 'b'"],
+            "conditions": [],
+        }
+
+        lifted_utterance, entities = self.abstraction.lift_entities(input_utterance)
+        self.assertEqual(expected_utterance, lifted_utterance)
+        self.assertEqual(expected_entities, entities)
+
+    def test_lift_entities_repeated(self):
+        # entities that occur again within a later entity are only lifted at their own position
+        input_utterance = "drop rows 1, 2 and 1, 2, 3 and select rows 2, 3 where 'a' >5 and 'b' == >5"
+        expected_utterance = (
+            "drop rows <number_list> and <number_list> and select rows <number_list> "
+            "where <value> <condition> and <value> <condition>"
+        )
+        expected_entities = {
+            "numbers": [],
+            "values": ["a", "b"],
+            "number_lists": ["1, 2", "1, 2, 3", "2, 3"],
+            "string_lists": [],
+            "conditions": [">5", "== >5"],
+        }
+
+        lifted_utterance, entities = self.abstraction.lift_entities(input_utterance)
+        self.assertEqual(expected_utterance, lifted_utterance)
+        self.assertEqual(expected_entities, entities)
+
+    def test_lift_entities_matches_sequential_lifting(self):
+        samples = {
+            "<value>": itertools.cycle(["'col A'", '"x"', "'Temp (F)'"]),
+            "<number>": itertools.cycle(["5", "-3.5", "0"]),
+            "<number_list>": itertools.cycle(["1, 2, 3", "0, 10"]),
+            "<string_list>": itertools.cycle(["'a', 'b'", '"x", "y", "z"']),
+            "<condition>": itertools.cycle(["> 5", "=='x'", "!= 7721", "<= 2.5"]),
+        }
+        data = Data()
+        for text in set(data.utterances) | set(data.actions):
+            utterance = re.sub(
+                r"<(value|number_list|string_list|number|condition)>", lambda m: next(samples[m.group()]), text
+            )
+            lifted_utterance, conditions = self.abstraction.lift_conditions(utterance)
+            lifted_utterance, string_lists = self.abstraction.lift_string_lists(lifted_utterance)
+            lifted_utterance, number_lists = self.abstraction.lift_number_lists(lifted_utterance)
+            lifted_utterance, values = self.abstraction.lift_values(lifted_utterance)
+            lifted_utterance, numbers = self.abstraction.lift_numbers(lifted_utterance)
+            expected_entities = {
+                "numbers": numbers,
+                "values": values,
+                "number_lists": number_lists,
+                "string_lists": string_lists,
+                "conditions": conditions,
+            }
+            self.assertEqual((lifted_utterance, expected_entities), self.abstraction.lift_entities(utterance))
+
     def test_replace_entities(self):
         input_action = 'DELETE COLUMNS "column1", "column2";SELECT ROWS 0, 1, 2, 3; DELETE ROWS WHERE "column3" == 0'
         input_entities = {
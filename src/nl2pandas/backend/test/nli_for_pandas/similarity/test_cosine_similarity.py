@@ -16,6 +16,22 @@ class TestCosineSimilarity(unittest.TestCase):
         assert np.isclose(self.cosine_similarity.calculate(vec1, vec2), 0)
         assert np.isclose(self.cosine_similarity.calculate(vec1, vec1), 1)
 
+    def test_calculate_matrix(self):
+        matrix1 = np.array([[1, 1], [1, -1], [2, 0]])
+        matrix2 = np.array([[1, 1], [0, 3]])
+
+        similarities = self.cosine_similarity.calculate_matrix(matrix1, matrix2)
+        expected = [[self.cosine_similarity.calculate(vec1, vec2) for vec2 in matrix2] for vec1 in matrix1]
+
+        self.assertEqual(similarities.shape, (3, 2))
+        assert np.allclose(similarities, expected)
+
+    def test_calculate_many(self):
+        vec = np.array([1, 1])
+        matrix = np.array([[1, 1], [1, -1], [-2, -2]])
+
+        assert np.allclose(self.cosine_similarity.calculate_many(vec, matrix), [1, 0, -1])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,10 +1,31 @@
 import os
-import shutil
+import subprocess
+import sys
+import threading
+import time
 import unittest
+from typing import List
+from unittest import mock
 
+import numpy as np
+from nl2pandas.backend.nli_for_pandas.data.data import Data
+from nl2pandas.backend.nli_for_pandas.embedding.embedding import Embedding
 from nl2pandas.backend.nli_for_pandas.pipeline import Pipeline
 
 
+class CountingEmbedding(Embedding):
+    """
+    Cheap embedding which records the sentences it was asked to embed.
+    """
+
+    def __init__(self):
+        self.embedded_sentences: List[str] = []
+
+    def embed(self, sentences: List[str]) -> np.ndarray:
+        self.embedded_sentences += sentences
+        return np.array([[len(sentence), sentence.count(" ") + 1.0] for sentence in sentences])
+
+
 class TestPipeline(unittest.TestCase):
     def setUp(self) -> None:
         self.pipeline = Pipeline()
@@ -69,15 +90,241 @@ class TestPipeline(unittest.TestCase):
         threshold = self.pipeline.determine_and_set_certainty_threshold()
         self.assertEqual(self.pipeline.certainty_threshold, threshold)
 
+    def test_determine_and_set_certainty_threshold_distinct(self):
+        threshold = self.pipeline.determine_and_set_certainty_threshold(thresholds="distinct")
+        self.assertEqual(self.pipeline.certainty_threshold, threshold)
+
+    def test_determine_and_set_certainty_threshold_index(self):
+        thresholds = [0, 0.5, 0.9]
+        predictions = np.array([0.2, 0.6, 0.95])
+
+        with mock.patch.object(self.pipeline, "get_similarities_and_true_values", return_value=(None, np.ones(3))), \
+                mock.patch.object(self.pipeline.classifier, "predict", return_value=predictions):
+            # the highest F1-Score is at the first threshold, so the last threshold is used
+            self.assertEqual(self.pipeline.determine_and_set_certainty_threshold(thresholds=thresholds), 0.9)
+
+        with mock.patch.object(self.pipeline, "get_similarities_and_true_values",
+                               return_value=(None, np.array([0, 0, 1]))), \
+                mock.patch.object(self.pipeline.classifier, "predict", return_value=predictions):
+            # the highest F1-Score is at the last threshold, so the threshold below it is used
+            self.assertEqual(self.pipeline.determine_and_set_certainty_threshold(thresholds=thresholds), 0.5)
+
+    def test_get_threshold_metrics(self):
+        rng = np.random.default_rng(0)
+        predictions = np.round(rng.random(200), 2)
+        true_values = (rng.random(200) < predictions).astype(int)
+        thresholds = np.arange(0, 1, 0.01)
+
+        f1score, tprs, accuracies = Pipeline.get_threshold_metrics(predictions, true_values, thresholds)
+
+        for i, t in enumerate(thresholds):
+            tp = np.sum((predictions >= t) & (true_values == 1))
+            fp = np.sum((predictions >= t) & (true_values == 0))
+            fn = np.sum((predictions < t) & (true_values == 1))
+            tn = np.sum((predictions < t) & (true_values == 0))
+
+            self.assertAlmostEqual(f1score[i], 2 * tp / (2 * tp + fp + fn))
+            self.assertAlmostEqual(tprs[i], tp / (tp + fn))
+            self.assertAlmostEqual(accuracies[i], (tp + tn) / (tp + fp + fn + tn))
+
     def test_save_classifier(self):
-        self.pipeline.save_classifier("./models/test_classifier.model")
-        assert os.path.exists("models/test_classifier.model")
+        self.pipeline.save_classifier("./models/test_classifier.json")
+        assert os.path.exists("models/test_classifier.json")
 
     def test_load_classifier(self):
-        self.pipeline.save_classifier(name="./models/test_classifier.model")
-        model = self.pipeline.load_classifier(name="./models/test_classifier.model")
+        self.pipeline.save_classifier(name="./models/test_classifier.json")
+        model = self.pipeline.load_classifier(name="./models/test_classifier.json")
         self.assertIsNotNone(model)
 
+    def test_utterance_embeddings_cached(self):
+        embedding = CountingEmbedding()
+        pipeline = Pipeline(embedding=embedding, data=Data())
+
+        pipeline.get_probabilities("delete column 'red pandas'")
+        self.assertEqual(len(embedding.embedded_sentences), len(pipeline.data.utterances) + 1)
+
+        embedding.embedded_sentences = []
+        pipeline.get_probabilities("delete row 1")
+        self.assertEqual(embedding.embedded_sentences, ["delete row <number>"])
+
+    def test_utterance_embeddings_embedded_once_by_concurrent_calls(self):
+        class SlowEmbedding(CountingEmbedding):
+            def embed(self, sentences: List[str]) -> np.ndarray:
+                time.sleep(0.1)
+                return super().embed(sentences)
+
+        embedding = SlowEmbedding()
+        pipeline = Pipeline(embedding=embedding, data=Data())
+
+        threads = [threading.Thread(target=pipeline.get_utterance_embeddings) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(embedding.embedded_sentences, pipeline.data.utterances)
+
+    def test_add_utterance_embeds_new_utterance_only(self):
+        embedding = CountingEmbedding()
+        pipeline = Pipeline(embedding=embedding, data=Data())
+        pipeline.get_utterance_embeddings()
+
+        embedding.embedded_sentences = []
+        pipeline.add_utterance("drop first row", "DELETE ROW 0")
+        embeddings = pipeline.get_utterance_embeddings()
+
+        self.assertEqual(embedding.embedded_sentences, ["drop first row"])
+        self.assertEqual(len(embeddings), len(pipeline.data.utterances))
+
+    def test_get_programs_batch(self):
+        embedding = CountingEmbedding()
+        pipeline = Pipeline(embedding=embedding, data=Data())
+        pipeline.get_utterance_embeddings()
+        utterances = ["delete column 'red pandas'", "drop rows 1, 2", "?"]
+
+        embedding.embedded_sentences = []
+        programs_list = pipeline.get_programs_batch(utterances)
+
+        self.assertEqual(embedding.embedded_sentences, ["delete column <value>", "drop rows <number_list>", "?"])
+        self.assertEqual(programs_list, [pipeline.get_programs(utterance) for utterance in utterances])
+
+    def test_get_candidates(self):
+        data = Data(csv_string="utterance,action\na,A\nb,B\nc,A\nd,C\ne,B\nf,D\n")
+        pipeline = Pipeline(embedding=CountingEmbedding(), data=data, certainty_threshold=0.5)
+        probabilities = np.array([0.6, 0.7, 0.9, 0.4, 0.7, 0.8])
+
+        self.assertEqual(pipeline.get_candidates(probabilities), [2, 5, 1])
+        self.assertEqual(pipeline.get_candidates(probabilities, top_k=2), [2, 5])
+
+        pipeline.add_utterance("g", "C")
+        self.assertEqual(pipeline.get_candidates(np.append(probabilities, 0.95), top_k=2), [6, 2])
+
+    def test_get_programs_top_k_falls_back(self):
+        pipeline = Pipeline(embedding=CountingEmbedding(), data=Data())
+        pipeline.classifier.a, pipeline.classifier.b = 0.0, 5.0  # every saved utterance is certain
+
+        programs = pipeline.get_programs("delete column 'red pandas'", top_k=1)
+        all_programs = pipeline.get_programs("delete column 'red pandas'")
+
+        self.assertEqual(1, len(programs))
+        self.assertNotEqual("NOT_SURE", programs[0]["grounded_action"])
+        self.assertEqual(all_programs[:1], programs)
+
+    def test_get_programs_batch_empty(self):
+        class SentenceTransformerEmbedding(CountingEmbedding):
+            def embed(self, sentences: List[str]) -> np.ndarray:
+                # SentenceTransformer.encode returns an array of shape (0,) for no sentences
+                return super().embed(sentences) if sentences else np.array([])
+
+        pipeline = Pipeline(embedding=SentenceTransformerEmbedding(), data=Data())
+
+        self.assertEqual([], pipeline.get_programs_batch([]))
+
+    def test_lifted_actions_cached(self):
+        pipeline = Pipeline(embedding=CountingEmbedding(), data=Data())
+        action = pipeline.data.actions[0]
+        lifted = pipeline.get_lifted_action(action)
+
+        self.assertEqual(lifted, pipeline.entity_abstraction.lift_entities(action))
+        self.assertIs(lifted, pipeline.get_lifted_action(action))
+        self.assertEqual(set(pipeline._lifted_actions), set(pipeline.data.actions))
+
+        pipeline.add_utterance("drop row 0 and column 'red pandas'", "DELETE ROW 0;DELETE COLUMN 'red pandas'")
+        self.assertNotIn("DELETE ROW <number>;DELETE COLUMN <value>", pipeline._lifted_actions)
+        self.assertEqual(
+            pipeline.get_lifted_action("DELETE ROW <number>;DELETE COLUMN <value>")[0],
+            "DELETE ROW <number>;DELETE COLUMN <value>",
+        )
+
+    def test_save_and_load_embeddings(self):
+        pipeline = Pipeline(embedding=CountingEmbedding(), data=Data())
+        pipeline.save_embeddings("./models/test_embeddings.npz")
+
+        embedding = CountingEmbedding()
+        pipeline = Pipeline(embedding=embedding, data=Data())
+        pipeline.add_utterance("drop first row", "DELETE ROW 0")
+        loaded = pipeline.load_embeddings("./models/test_embeddings.npz")
+        embeddings = pipeline.get_utterance_embeddings()
+
+        self.assertEqual(len(loaded), len(pipeline.data.utterances) - 1)
+        self.assertEqual(embedding.embedded_sentences, ["drop first row"])
+        self.assertEqual(len(embeddings), len(pipeline.data.utterances))
+
+    def test_load_embeddings_of_other_model(self):
+        pipeline = Pipeline(embedding=CountingEmbedding(), data=Data())
+        pipeline.save_embeddings("./models/test_embeddings.npz")
+
+        class OtherEmbedding(CountingEmbedding):
+            def embed(self, sentences: List[str]) -> np.ndarray:
+                self.embedded_sentences += sentences
+                return np.ones((len(sentences), 3))
+
+        embedding = OtherEmbedding()
+        pipeline = Pipeline(embedding=embedding, data=Data())
+        self.assertIsNone(pipeline.load_embeddings("./models/test_embeddings.npz"))
+        self.assertEqual((len(pipeline.data.utterances), 3), pipeline.get_utterance_embeddings().shape)
+        self.assertEqual(embedding.embedded_sentences, pipeline.data.utterances)
+
+    def test_embedding_dimension_changed(self):
+        pipeline = Pipeline(embedding=CountingEmbedding(), data=Data())
+        pipeline.get_utterance_embeddings()
+
+        pipeline.embedding.embed = lambda sentences: np.ones((len(sentences), 3))
+        pipeline.add_utterance("drop first row", "DELETE ROW 0")
+        self.assertEqual((len(pipeline.data.utterances), 3), pipeline.get_utterance_embeddings().shape)
+
+    def test_embeddings_persisted_after_first_embedding(self):
+        pipeline = Pipeline(embedding=CountingEmbedding(), data=Data())
+        pipeline.load_embeddings("./models/test_embeddings.npz")
+
+        # the first query embeds all utterances, they are written once in the background
+        pipeline.get_programs("delete row 1")
+        persist_thread = pipeline._persist_thread
+        persist_thread.join()
+
+        embedding = CountingEmbedding()
+        loaded_pipeline = Pipeline(embedding=embedding, data=Data())
+        self.assertEqual(len(loaded_pipeline.data.utterances),
+                         len(loaded_pipeline.load_embeddings("./models/test_embeddings.npz")))
+
+        # later queries do not write the file
+        pipeline.add_utterance("drop first row", "DELETE ROW 0")
+        pipeline.get_programs("delete row 1")
+        self.assertIs(persist_thread, pipeline._persist_thread)
+        with np.load("./models/test_embeddings.npz") as stored:
+            self.assertEqual(len(pipeline.data.utterances) - 1, len(stored["utterances"]))
+
+        self.assertTrue(pipeline.persist_embeddings())
+        self.assertFalse(pipeline.persist_embeddings())
+        with np.load("./models/test_embeddings.npz") as stored:
+            self.assertEqual(len(pipeline.data.utterances), len(stored["utterances"]))
+
+    def test_persist_embeddings_write_error(self):
+        pipeline = Pipeline(embedding=CountingEmbedding(), data=Data())
+        pipeline.load_embeddings("./models/missing_directory/test_embeddings.npz")
+
+        embeddings = pipeline.get_utterance_embeddings()
+        self.assertFalse(pipeline.persist_embeddings())
+        self.assertIs(embeddings, pipeline.get_utterance_embeddings())
+
+    def test_import_and_init_do_not_load_models(self):
+        code = (
+            "import sys\n"
+            "from nl2pandas.backend.nli_for_pandas.pipeline import Pipeline\n"
+            "Pipeline()\n"
+            "print([m for m in ('tensorflow', 'sentence_transformers', 'matplotlib.pyplot') if m in sys.modules])"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+        ).stdout
+        self.assertEqual(output.strip(), "[]")
+
     def tearDown(self) -> None:
-        if os.path.isdir("models/test_classifier.model"):
-            shutil.rmtree("models/test_classifier.model")
+        if os.path.exists("models/test_classifier.json"):
+            os.remove("models/test_classifier.json")
+        if os.path.exists("models/test_embeddings.npz"):
+            os.remove("models/test_embeddings.npz")
@@ -1,8 +1,8 @@
 import unittest
+from unittest import mock
 
 import IPython
 import pandas as pd
-import pytest
 from IPython.core.interactiveshell import InteractiveShell
 from nl2pandas.backend.pandas_generator.context.context import Context
 from nl2pandas.backend.pandas_generator.refiner.refiner import Refiner
@@ -81,6 +81,24 @@ class TestContext(unittest.TestCase):
         self.assertEqual([key for key in self.context.active_df_columns], ['id', 'B', 'C', 'D', 'None'])
         self.assertEqual([key for key in self.context.active_df_indices], [0, 1, 2, 'None'])
 
+    def test_active_df_labels_are_views(self):
+        new_shell = IPython.InteractiveShell().get_ipython()
+        new_shell.run_cell("import pandas as pd\ndf5 = pd.DataFrame({'A': range(100000)})", store_history=True)
+        new_context = Context(new_shell)
+        new_context.update_context(new_shell)
+        new_context.active_dataframe = 'df5'
+
+        self.assertIs(new_context.dataframes['df5']['indices'], new_shell.user_ns['df5'].index)
+        self.assertNotIsInstance(new_context.active_df_indices, list)
+        self.assertEqual(len(new_context.active_df_indices), 100001)
+        self.assertEqual(new_context.active_df_indices[0], 0)
+        self.assertEqual(new_context.active_df_indices[-1], 'None')
+        self.assertTrue(99999 in new_context.active_df_indices)
+        self.assertTrue('None' in new_context.active_df_indices)
+        self.assertFalse(100000 in new_context.active_df_indices)
+        self.assertFalse(['A'] in new_context.active_df_columns)
+        self.assertEqual(new_context.active_df_columns, ['A', 'None'])
+
     def test_set_refinement(self):
         refiner = Refiner(self.context)
         self.context.set_refiner(refiner)
@@ -115,6 +133,23 @@ class TestContext(unittest.TestCase):
         self.assertEqual(result, True)
         self.assertEqual(df, ['df4'])
 
+    def test_label_lookups_follow_dataframe_changes(self):
+        new_context = Context(self.shell)
+        new_context.set_dataframe('a', pd.DataFrame({'x': [1, 2]}, index=['r1', 'r2']))
+        new_context.set_dataframe('b', pd.DataFrame({'x': [1], 'y': [2]}, index=['r2']))
+
+        self.assertEqual(new_context.is_column_name('x'), (True, ['a', 'b']))
+        self.assertEqual(new_context.is_column_name(['x', 'y']), (True, ['b']))
+        self.assertEqual(new_context.is_index(['r1', 'r2']), (True, ['a']))
+        self.assertEqual(new_context.is_index({'unhashable': 1}), (False, []))
+
+        new_context.set_dataframe('a', pd.DataFrame({'y': [1]}, index=['r3']))
+
+        self.assertEqual(new_context.is_column_name(['x', 'y']), (True, ['b']))
+        self.assertEqual(new_context.is_column_name('y'), (True, ['a', 'b']))
+        self.assertEqual(new_context.is_index('r1'), (False, []))
+        self.assertEqual(new_context.is_index('r3'), (True, ['a']))
+
     def test_validate_active_df_change_df(self):
         self.context.update_context(self.shell)
         self.context.active_dataframe = 'df1'
@@ -182,7 +217,44 @@ class TestContext(unittest.TestCase):
         df_cells = new_context.get_cell_df(dfs, cells)
         self.assertEqual(df_cells, cell_df)
 
-    @pytest.mark.xfail()
+    def test_get_cell_names(self):
+        new_shell = IPython.InteractiveShell().get_ipython()
+        new_shell.run_cell("import pandas as pd\ndf = pd.DataFrame({'a': [1]})\nmydf = df[['a']]\nprint(mydf.copy())",
+                           store_history=True)
+        new_context = Context(new_shell)
+
+        names = new_context.get_cell_names('_i1')
+        self.assertEqual(names, {'import', 'pandas', 'as', 'pd', 'df', 'mydf'})
+        self.assertIs(new_context.get_cell_names('_i1'), names)
+        self.assertEqual(new_context.get_cell_df(['df', 'mydf', 'my'], ['_i1']), {'_i1': ['df', 'mydf']})
+
+    def test_update_context_incremental(self):
+        new_shell = IPython.InteractiveShell().get_ipython()
+        new_shell.run_cell("import pandas as pd\ndf8 = pd.DataFrame({'a': [1]})", store_history=True)
+        new_context = Context(new_shell)
+        new_context.update_context(new_shell)
+        entry = new_context.dataframes['df8']
+        scanned_cells = list(new_context.cells)
+
+        self.assertEqual(new_context.active_dataframe, 'df8')
+        self.assertEqual(new_context.get_new_cells(), [])
+
+        new_shell.run_cell("x = 1", store_history=True)
+        new_shell.run_cell("df9 = df8.copy()\ndf9", store_history=True)
+        new_context.update_context(new_shell)
+
+        self.assertEqual(new_context.cells[:len(scanned_cells)], scanned_cells)
+        self.assertEqual(len(new_context.cells), len(scanned_cells) + 2)
+        self.assertEqual(new_context.current_cell, "df9 = df8.copy()\ndf9")
+        self.assertIs(new_context.dataframes['df8'], entry)
+        self.assertEqual(new_context.active_dataframe, 'df8')
+
+        new_shell.run_cell("df8['b'] = 2", store_history=True)
+        new_context.update_context(new_shell)
+
+        self.assertIsNot(new_context.dataframes['df8'], entry)
+        self.assertEqual([column for column in new_context.active_df_columns], ['a', 'b', 'None'])
+
     def test_validate_function(self):
         self.context.update_context(self.shell)
 
@@ -195,6 +267,75 @@ class TestContext(unittest.TestCase):
         self.assertEqual(success, True)
         self.assertEqual(warning, None)
 
+    def test_validate_function_does_not_change_namespace(self):
+        new_shell = IPython.InteractiveShell().get_ipython()
+        new_shell.run_cell("import pandas as pd\ndf = pd.DataFrame({'A': range(200), 'B': range(200)})",
+                           store_history=True)
+        new_context = Context(new_shell)
+        new_context.update_context(new_shell)
+        df = new_shell.user_ns['df']
+
+        success, warning = new_context.validate_function("df.drop(columns='B', inplace=True)\ndf = df.head(1)")
+        self.assertEqual(success, True)
+        self.assertIs(new_shell.user_ns['df'], df)
+        self.assertEqual(df.shape, (200, 2))
+
+        # the label is not part of the sample, the code is validated on a full copy
+        success, warning = new_context.validate_function("df = df.drop(labels=150)")
+        self.assertEqual(success, True)
+
+        success, warning = new_context.validate_function("df = df.drop(labels=250)")
+        self.assertEqual(success, False)
+        self.assertIsInstance(warning, KeyError)
+
+    def test_validate_function_retries_sampling_errors_only(self):
+        new_shell = IPython.InteractiveShell().get_ipython()
+        new_shell.run_cell("import pandas as pd\ndf = pd.DataFrame({'A': range(200), 'B': range(200)})",
+                           store_history=True)
+        new_context = Context(new_shell)
+        new_context.update_context(new_shell)
+
+        with mock.patch.object(new_context, '_execute_on_copies', wraps=new_context._execute_on_copies) as execute:
+            # a misspelled column fails on the full dataframe as well, it is not run again
+            success, warning = new_context.validate_function("df = df['C']")
+            self.assertEqual(success, False)
+            self.assertIsInstance(warning, KeyError)
+            self.assertEqual([call.args[1] for call in execute.call_args_list], [100])
+
+            execute.reset_mock()
+            success, warning = new_context.validate_function("df = df.loc[[150]]")
+            self.assertEqual(success, True)
+            self.assertEqual([call.args[1] for call in execute.call_args_list], [100, None])
+
+            execute.reset_mock()
+            success, warning = new_context.validate_function("df = df.iloc[[150]]")
+            self.assertEqual(success, True)
+            self.assertEqual([call.args[1] for call in execute.call_args_list], [100, None])
+
+    def test_validate_function_dry_run(self):
+        new_shell = IPython.InteractiveShell().get_ipython()
+        new_shell.run_cell("import pandas as pd\ndf = pd.DataFrame({'A': range(200), 'B': ['x'] * 200})",
+                           store_history=True)
+        new_context = Context(new_shell)
+        new_context.update_context(new_shell)
+
+        success, warning = new_context.validate_function("df = df.sort_values(by='A')", dry_run=True)
+        self.assertEqual(success, True)
+
+        success, warning = new_context.validate_function("df = df.sort_values(by='C')", dry_run=True)
+        self.assertEqual(success, False)
+        self.assertIsInstance(warning, KeyError)
+
+        success, warning = new_context.validate_function("df = df.sort_values(by='A', kind=1)", dry_run=True)
+        self.assertEqual(success, False)
+
+        success, warning = new_context.validate_function("df['B'] = df['B'].str.strip()", dry_run=True)
+        self.assertEqual(success, True)
+
+        success, warning = new_context.validate_function("df['A'] = df['A'].str.strip()", dry_run=True)
+        self.assertEqual(success, False)
+        self.assertIsInstance(warning, AttributeError)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,3 +1,6 @@
+import ast
+import os
+import tempfile
 import unittest
 
 import pandas as pd
@@ -54,6 +57,31 @@ class TestPandasManager(unittest.TestCase):
         self.assertEqual(doc, "Remove leading and trailing characters.")
         self.assertEqual(programs[0]['scope_options'], ['subset_col'])
 
+    def test_get_programs_batch(self):
+        utterances = ["strip '(m)' from column 'A' ", "delete column 'B'", "?"]
+        programs_list = self.manager.get_programs_batch(utterances)
+
+        self.assertEqual(len(utterances), len(programs_list))
+        for utterance, programs in zip(utterances, programs_list):
+            expected = self.manager.get_programs(utterance)
+            self.assertEqual(
+                [(program['grounded_action'], program.get('kwargs')) for program in expected],
+                [(program['grounded_action'], program.get('kwargs')) for program in programs]
+            )
+
+    def test_get_programs_batch_empty(self):
+        self.assertEqual([], self.manager.get_programs_batch([]))
+
+    def test_get_programs_persists_embeddings(self):
+        with tempfile.TemporaryDirectory() as directory:
+            name = os.path.join(directory, 'embeddings.npz')
+            self.manager.pipeline.load_embeddings(name)
+
+            self.manager.get_programs("strip '(m)' from column 'A' ")
+            self.manager.pipeline._persist_thread.join()
+
+            self.assertTrue(os.path.exists(name))
+
     def test_get_translation(self):
         programs = self.manager.pipeline.get_programs("strip '(m)' from column 'A' ")[:4]
         programs = self.manager.validate_entity_sequence(programs)
@@ -66,9 +94,22 @@ class TestPandasManager(unittest.TestCase):
         self.assertEqual(translation[0]['grounded_action'], 'ON COLUMN "A" STRIP "(m)"')
         self.assertEqual(translation[0]['nl_utterance'], "strip '(m)' from column 'A' ")
 
+    def test_restore_program(self):
+        programs = self.manager.get_programs("strip '(m)' from column 'A' ")
+        record = self.manager.get_program_record(programs[0])
+        record = ast.literal_eval(str(record))
+
+        self.manager.pipeline = None  # restoring must not use the pipeline
+        program = self.manager.restore_program(record, "strip '(m)' from column 'A' ")
+
+        for key in ['general_action', 'entities', 'grounded_action', 'general_pandas_function', 'kwargs', 'scope',
+                    'scope_options', 'probability', 'nl_utterance', 'documentation']:
+            self.assertEqual(program[key], programs[0][key])
+
     def test_get_documentation(self):
         doc = self.manager.get_documentation(pd.Series.str.strip)
         self.assertEqual(doc.rsplit("\n")[0], "Remove leading and trailing characters.")
+        self.assertIs(self.manager.get_documentation(pd.Series.str.strip), doc)
 
     def test_get_refiner(self):
         programs = self.manager.get_programs("strip '(m)' from column 'A' ")
@@ -3,7 +3,11 @@ import unittest
 import pandas as pd
 from IPython.core.interactiveshell import InteractiveShell
 from nl2pandas.backend.pandas_generator.context.context import Context
-from nl2pandas.backend.pandas_generator.refiner.refiner import Refiner
+from nl2pandas.backend.pandas_generator.refiner.refiner import (
+    Refiner,
+    get_static_function_parameters,
+)
+from nl2pandas.backend.pandas_generator.translator.translator import freeze
 
 
 class TestRefiner(unittest.TestCase):
@@ -143,6 +147,33 @@ class TestRefiner(unittest.TestCase):
         self.assertEqual([val for val in parameters['kind']['options']],
                          ['quicksort', 'mergesort', 'heapsort', 'stable'])
 
+    def test_get_function_parameters_cached(self):
+        self.refiner.set_refiner(self.program1)
+        param_specs = freeze(self.program1['parameter_specifications'])
+
+        parameters1 = self.refiner.get_function_parameters(pd.DataFrame.sort_values, param_specs)
+        parameters2 = self.refiner.get_function_parameters(pd.DataFrame.sort_values, param_specs)
+
+        self.assertIs(get_static_function_parameters(pd.DataFrame.sort_values, param_specs),
+                      get_static_function_parameters(pd.DataFrame.sort_values, param_specs))
+        self.assertIsNot(get_static_function_parameters(pd.DataFrame.sort_values, self.program1['parameter_specifications']),
+                         get_static_function_parameters(pd.DataFrame.sort_values, self.program1['parameter_specifications']))
+        self.assertEqual(parameters1, parameters2)
+        parameters1['kind']['options'].append('other')
+        parameters1['na_position']['value'] = 'first'
+        self.assertEqual(parameters2['kind']['options'], ['quicksort', 'mergesort', 'heapsort', 'stable'])
+        self.assertEqual(parameters2['na_position']['value'], 'last')
+
+        # dataframe dependent options are set per call
+        self.shell.run_cell("df3 = pd.DataFrame(np.arange(12).reshape(3, 4), "
+                            "columns=['df3_1', 'df3_2', 'df3_3', 'df4_4'])",
+                            store_history=True
+                            )
+        self.context.update_context(self.shell)
+        self.context.active_dataframe = 'df3'
+        parameters3 = self.refiner.get_function_parameters(pd.DataFrame.sort_values, param_specs)
+        self.assertEqual([val for val in parameters3['by']['options']], ['df3_1', 'df3_2', 'df3_3', 'df4_4', 'None'])
+
     def test_get_scope_options(self):
         self.refiner.set_refiner(self.program2)
         scope_options = ['subset_col']
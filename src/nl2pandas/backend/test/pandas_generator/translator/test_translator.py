@@ -2,7 +2,10 @@ import unittest
 
 import pandas as pd
 from IPython.core.interactiveshell import InteractiveShell
-from nl2pandas.backend.pandas_generator.translator.translator import Translator
+from nl2pandas.backend.pandas_generator.translator.translator import (
+    Translator,
+    program_spec,
+)
 
 
 class TestTranslator(unittest.TestCase):
@@ -33,6 +36,38 @@ class TestTranslator(unittest.TestCase):
 
         self.assertEqual(program, expected)
 
+    def test_get_pandas_func_shares_read_only_specs(self):
+        dsl_action = 'SORT VALUES BY <value>'
+        program1 = self.translator.get_pandas_func(dsl_action, {'<value0>': 'A'})
+        program2 = self.translator.get_pandas_func(dsl_action, {'<value0>': 'B'})
+
+        self.assertIs(program1['parameter_specifications'], program2['parameter_specifications'])
+        with self.assertRaises(TypeError):
+            program1['parameter_specifications']['by']['dtype'] = 'text'
+
+        self.assertEqual(program1['kwargs'], {'by': 'A', 'axis': 'index', 'inplace': True})
+        self.assertEqual(program2['kwargs'], {'by': 'B', 'axis': 'index', 'inplace': True})
+        program1['scope_options'].append('subset_col')
+        self.assertEqual(program2['scope_options'], [])
+
+    def test_register(self):
+        self.assertEqual(self.translator.get_pandas_func('SHOW LAST ROWS', {})['general_pandas_function'],
+                         'not implemented')
+
+        spec = program_spec(
+            general_pandas_function="tail",
+            class_callable=pd.DataFrame.tail,
+            type="pandas.DataFrame",
+            build=lambda entities: ({}, {})
+        )
+        self.translator.register('SHOW LAST ROWS', spec)
+        program = self.translator.get_pandas_func('SHOW LAST ROWS', {})
+
+        self.assertEqual(program['general_pandas_function'], 'tail')
+        self.assertEqual(program['class_callable'], pd.DataFrame.tail)
+        self.assertEqual(Translator().get_pandas_func('SHOW LAST ROWS', {})['general_pandas_function'],
+                         'not implemented')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,94 @@
+import numpy as np
+
+from Memory_NLI.memory_index import EmbeddingIndex, UtteranceIndex
+
+
+class FakeModel:
+    "A sentence transformer that embeds an utterance as the counts of a few words"
+
+    words = ["drop", "column", "row", "sort", "rename"]
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, utterances):
+        self.encoded += utterances
+        return np.array([[utterance.split().count(word) + 0.01 for word in self.words] for utterance in utterances])
+
+
+def test_embedding_index_update_encodes_new_utterances_once(tmp_path):
+    model = FakeModel()
+    index = EmbeddingIndex(model, str(tmp_path / "embeddings.npz"))
+
+    index.update(["drop column", "sort row"])
+    index.update(["drop column", "rename column", "rename column"])
+
+    assert model.encoded == ["drop column", "sort row", "rename column"]
+    assert index.utterances == ["drop column", "sort row", "rename column"]
+    assert np.allclose(np.linalg.norm(index.embeddings, axis=1), 1)
+
+
+def test_embedding_index_search():
+    index = EmbeddingIndex(FakeModel(), "unused.npz")
+    assert index.search("drop column") == []
+
+    index.update(["drop column", "drop row", "sort row"])
+
+    results = index.search("drop column", threshold=0.5)
+    assert [utterance for utterance, similarity in results] == ["drop column", "drop row"]
+    assert results[0][1] > results[1][1] > 0.5
+    assert index.search("drop column", threshold=0.5, top_k=1) == results[:1]
+
+
+def test_embedding_index_save_and_load(tmp_path):
+    file_path = str(tmp_path / "embeddings.npz")
+    index = EmbeddingIndex(FakeModel(), file_path, save_every=2)
+
+    index.update(["drop column"])
+    assert not (tmp_path / "embeddings.npz").exists()
+    index.update(["sort row"])
+    assert (tmp_path / "embeddings.npz").exists()
+    index.update(["rename column"])
+    index.flush()
+
+    model = FakeModel()
+    loaded = EmbeddingIndex(model, file_path)
+    loaded.update(["drop column", "sort row", "rename column"])
+
+    assert model.encoded == []
+    assert loaded.utterances == index.utterances
+    assert np.allclose(loaded.embeddings, index.embeddings)
+    assert loaded.search("rename column") == index.search("rename column")
+
+
+def test_utterance_index_search():
+    index = UtteranceIndex()
+    for entry_index, utterance in enumerate(["drop column", "drop column a", "column", "sort rows"]):
+        index.add(utterance, entry_index)
+    index.add("drop column", 4)
+
+    # exact matches first, then the past utterances that contain or are contained in the utterance by length ratio
+    assert index.search("drop column") == [
+        (0, 100),
+        (4, 100),
+        (1, round(len("drop column") / len("drop column a") * 100, 2)),
+        (2, round(len("column") / len("drop column") * 100, 2)),
+    ]
+
+
+def test_utterance_index_containing_and_contained():
+    index = UtteranceIndex(n=3)
+    for entry_index, utterance in enumerate(["drop column", "drop column a", "column", "sort rows"]):
+        index.add(utterance, entry_index)
+
+    assert sorted(index.containing("column")) == ["column", "drop column", "drop column a"]
+    assert sorted(index.containing("col")) == ["column", "drop column", "drop column a"]
+    assert index.contained("please drop column now") == {"drop column", "column"}
+
+
+def test_utterance_index_no_match():
+    index = UtteranceIndex()
+    assert index.search("drop column") == []
+
+    index.add("sort rows", 0)
+    assert index.search("drop column") == []
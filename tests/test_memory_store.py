@@ -0,0 +1,81 @@
+import pandas as pd
+
+from Memory_NLI.memory_store import MemoryStore
+
+
+def make_entry(utterance, action_info_index=0, program=None):
+    return {
+        "utterance": utterance,
+        "action_info_index": action_info_index,
+        "generation_utterance": utterance,
+        "refined_kwargs": "{}",
+        "dataframe": "{'name': 'df'}",
+        "program": program,
+    }
+
+
+def test_wal_mode(tmp_path):
+    store = MemoryStore(str(tmp_path / "memory.sqlite3"))
+
+    assert store.connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    store.close()
+
+
+def test_add_ignores_duplicates(tmp_path):
+    store = MemoryStore(str(tmp_path / "memory.sqlite3"))
+
+    stored = store.add(make_entry("drop column 'A'"))
+    assert stored["utterance"] == "drop column 'A'"
+    assert stored["program"] == ""
+
+    assert store.add(make_entry("drop column 'A'")) is None
+    assert store.add(make_entry("drop column 'A'", action_info_index=1)) is not None
+    assert len(store.load()) == 2
+    store.close()
+
+
+def test_load_order_after_reopen(tmp_path):
+    file_path = str(tmp_path / "memory.sqlite3")
+    store = MemoryStore(file_path)
+    utterances = ["sort rows", "drop column 'A'", "rename 'B' to 'C'"]
+    for utterance in utterances:
+        store.add(make_entry(utterance))
+    store.close()
+
+    store = MemoryStore(file_path)
+    entries = store.load()
+
+    assert [entry["utterance"] for entry in entries] == utterances
+    assert entries[0] == dict(make_entry("sort rows"), program="")
+    store.close()
+
+
+def test_import_csv_once(tmp_path):
+    csv_path = str(tmp_path / "past_utterances_save.csv")
+    pd.DataFrame([
+        dict(make_entry("sort rows"), program="{'general_action': 'SORT'}"),
+        dict(make_entry("drop column 'A'"), dataframe="   A  B\n0  1  2"),
+    ]).to_csv(csv_path, index=False)
+
+    store = MemoryStore(str(tmp_path / "memory.sqlite3"))
+    store.import_csv(csv_path)
+    entries = store.load()
+
+    assert [entry["utterance"] for entry in entries] == ["sort rows", "drop column 'A'"]
+    assert entries[0]["program"] == "{'general_action': 'SORT'}"
+    # text dumps of dataframes are not imported
+    assert entries[1]["dataframe"] == ""
+
+    # later imports do nothing, even if the file changed
+    pd.DataFrame([make_entry("rename 'B' to 'C'")]).to_csv(csv_path, index=False)
+    store.import_csv(csv_path)
+    assert store.load() == entries
+    store.close()
+
+
+def test_import_missing_csv(tmp_path):
+    store = MemoryStore(str(tmp_path / "memory.sqlite3"))
+    store.import_csv(str(tmp_path / "missing.csv"))
+
+    assert store.load() == []
+    store.close()